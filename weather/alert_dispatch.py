@@ -0,0 +1,205 @@
+"""
+GS건설 현장 기상 알림 텔레그램 발송기
+=====================================
+메시지를 대기열에 넣으면 백그라운드 스레드가 순서대로 전송하는 모듈.
+표준 라이브러리와 requests만 사용하며 Streamlit 앱 옆에서 스레드로 실행된다.
+
+- 메시지 길이 제한(4096자)을 넘으면 줄 단위로 나눠 (1/N) 표시 후 전송
+- 채팅방별 최소 전송 간격 유지, 429 응답 시 retry_after 만큼 대기 후 재시도
+- 같은 채팅방에 같은 내용이 DEDUP_WINDOW_SEC 안에 다시 들어오면 생략
+- 메시지별 완료 콜백(on_done)으로 최종 전송 성공 여부를 호출 측에 알림
+"""
+
+# ============================================================
+# 라이브러리 임포트
+# ============================================================
+import time
+import queue
+import hashlib
+import threading
+import collections
+
+import requests
+
+
+# ============================================================
+# 상수 및 설정값
+# ============================================================
+TELEGRAM_API_URL   = "https://api.telegram.org/bot{token}/sendMessage"
+TELEGRAM_MAX_LEN   = 4096    # 메시지 최대 길이 (UTF-16 코드 단위)
+PART_SUFFIX_LEN    = 12      # 분할 표시 '\n(12/34)' 자리
+
+CHAT_INTERVAL_SEC  = 1.0     # 개인 채팅: 초당 1건
+GROUP_INTERVAL_SEC = 3.0     # 그룹/채널(음수 ID): 분당 20건
+MAX_RETRIES        = 3       # 429·5xx·네트워크 오류 재시도 횟수
+RETRY_BACKOFF_SEC  = 2.0     # 재시도 대기 기본값 (회차마다 2배)
+DEDUP_WINDOW_SEC   = 3600    # 같은 내용 재전송 차단 시간
+LOG_LEN            = 50      # 보관할 전송 결과 개수
+
+
+# ============================================================
+# 메시지 분할
+# ============================================================
+
+def text_length(text: str) -> int:
+    """텔레그램 기준 메시지 길이 (UTF-16 코드 단위, 이모지는 2)"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def split_message(text: str, limit: int = TELEGRAM_MAX_LEN) -> list[str]:
+    """
+    메시지를 limit 이하 조각으로 분할.
+    줄 단위로 나누고, 한 줄이 limit보다 길면 글자 단위로 자른다.
+    여러 조각이면 각 조각 끝에 '(i/N)'을 붙인다.
+    """
+    if text_length(text) <= limit:
+        return [text]
+
+    budget = limit - PART_SUFFIX_LEN
+    chunks, current = [], ""
+    for line in text.split("\n"):
+        while text_length(line) > budget:
+            if current:
+                chunks.append(current)
+                current = ""
+            cut = budget
+            while text_length(line[:cut]) > budget:
+                cut -= 1
+            chunks.append(line[:cut])
+            line = line[cut:]
+
+        candidate = f"{current}\n{line}" if current else line
+        if text_length(candidate) > budget:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+
+    return [f"{chunk}\n({i}/{len(chunks)})" for i, chunk in enumerate(chunks, start=1)]
+
+
+# ============================================================
+# 발송 대기열
+# ============================================================
+
+def start_dispatcher(token: str) -> dict:
+    """
+    발송 스레드를 데몬으로 시작 후 발송기 상태 반환.
+    {'token', 'queue', 'lock', 'recent': {내용 해시: 등록 시각},
+     'next_send': {채팅방: 다음 전송 가능 시각}, 'log': deque}
+    """
+    dispatcher = {
+        "token":     token,
+        "queue":     queue.Queue(),
+        "lock":      threading.Lock(),
+        "recent":    {},
+        "next_send": {},
+        "log":       collections.deque(maxlen=LOG_LEN),
+    }
+    threading.Thread(
+        target=_run_dispatcher, args=(dispatcher,), name="telegram-dispatch", daemon=True
+    ).start()
+    return dispatcher
+
+
+def enqueue_message(dispatcher: dict, chat_id: str, text: str, label: str = "",
+                    on_done=None) -> bool:
+    """
+    메시지를 발송 대기열에 추가 (즉시 반환).
+    같은 채팅방에 DEDUP_WINDOW_SEC 안에 같은 내용이 등록돼 있으면 추가하지 않고 False 반환.
+    on_done(ok)는 전송이 끝나면(재시도 포함 최종 성공/실패) 발송 스레드에서 호출된다.
+    """
+    digest = hashlib.sha1(f"{chat_id}\n{text}".encode("utf-8")).hexdigest()
+    now    = time.monotonic()
+    with dispatcher["lock"]:
+        recent = dispatcher["recent"]
+        for key in [k for k, t in recent.items() if now - t > DEDUP_WINDOW_SEC]:
+            del recent[key]
+        if digest in recent:
+            return False
+        recent[digest] = now
+
+    dispatcher["queue"].put((str(chat_id), split_message(text), digest, label, on_done))
+    return True
+
+
+def pending_count(dispatcher: dict) -> int:
+    """전송 대기 중인 메시지 수"""
+    return dispatcher["queue"].unfinished_tasks
+
+
+def _run_dispatcher(dispatcher: dict) -> None:
+    """대기열의 메시지를 순서대로 전송 (조각 하나라도 실패하면 나머지 생략)"""
+    while True:
+        chat_id, chunks, digest, label, on_done = dispatcher["queue"].get()
+        ok, detail = True, "전송 완료"
+        try:
+            for chunk in chunks:
+                ok, detail = _send_with_retry(dispatcher, chat_id, chunk)
+                if not ok:
+                    break
+        except Exception as e:
+            ok, detail = False, f"전송 중 오류 발생: {e}"
+
+        if not ok:
+            # 실패한 내용은 다시 보낼 수 있도록 중복 차단 해제
+            with dispatcher["lock"]:
+                dispatcher["recent"].pop(digest, None)
+        dispatcher["log"].append({
+            "time":    time.time(),
+            "chat_id": chat_id,
+            "label":   label,
+            "parts":   len(chunks),
+            "ok":      ok,
+            "detail":  detail,
+        })
+        if on_done is not None:
+            try:
+                on_done(ok)
+            except Exception:
+                pass   # 콜백 오류로 발송 스레드가 멈추지 않도록 무시
+        dispatcher["queue"].task_done()
+
+
+def _wait_turn(dispatcher: dict, chat_id: str) -> None:
+    """채팅방별 최소 전송 간격(또는 429 retry_after)까지 대기"""
+    interval = GROUP_INTERVAL_SEC if chat_id.startswith("-") else CHAT_INTERVAL_SEC
+    delay    = dispatcher["next_send"].get(chat_id, 0.0) - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    dispatcher["next_send"][chat_id] = time.monotonic() + interval
+
+
+def _send_with_retry(dispatcher: dict, chat_id: str, text: str) -> tuple[bool, str]:
+    """메시지 1건 전송. 429·5xx·네트워크 오류는 MAX_RETRIES회까지 재시도"""
+    url    = TELEGRAM_API_URL.format(token=dispatcher["token"])
+    detail = ""
+    for attempt in range(MAX_RETRIES + 1):
+        _wait_turn(dispatcher, chat_id)
+        try:
+            resp = requests.post(url, json={"chat_id": chat_id, "text": text}, timeout=10)
+        except requests.RequestException as e:
+            detail = f"전송 중 오류 발생: {e}"
+            time.sleep(RETRY_BACKOFF_SEC * 2 ** attempt)
+            continue
+
+        if resp.status_code == 200:
+            return True, "전송 완료"
+
+        if resp.status_code == 429:
+            try:
+                retry_after = float(resp.json()["parameters"]["retry_after"])
+            except Exception:
+                retry_after = RETRY_BACKOFF_SEC * 2 ** attempt
+            dispatcher["next_send"][chat_id] = time.monotonic() + retry_after
+            detail = f"전송 제한 (429, {retry_after:.0f}초 후 재시도)"
+            continue
+
+        detail = f"전송 실패 (Status: {resp.status_code})"
+        if resp.status_code < 500:
+            return False, detail
+        time.sleep(RETRY_BACKOFF_SEC * 2 ** attempt)
+
+    return False, detail
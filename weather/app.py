@@ -10,21 +10,43 @@ GS건설 현장 기상/작업통제 현황 시스템
 # ============================================================
 import os
 import re
-import io
 import math
 import time
+import copy
 import base64
+import functools
+import threading
+import collections
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.machinery import ModuleSpec
+import hashlib
 import datetime
 
 import pytz
+import numpy as np
 import requests
 import pandas as pd
 import folium
 import streamlit as st
-from PIL import Image, ImageDraw, ImageFont
 from geopy.geocoders import Nominatim
 from streamlit_folium import st_folium
 
+import poster
+import gazetteer
+import snapshot_api
+import alert_dispatch
+from work_rules import (
+    NOWCAST_CATEGORIES, NOWCAST_INDEX, ALLOWED_WARNING_KEYWORDS, WARNING_LEVELS, WARNING_TYPES,
+    STATUS_LABELS, STATUS_WARNING, STATUS_STOP_OUT, STATUS_STOP_ALL, MARKER_COLORS, MARKER_ICONS,
+    WORK_RULES_DEFAULT, validate_work_rules, compile_work_rules, evaluate_work_rules,
+)
+
+# Streamlit은 이 스크립트를 가짜 __main__ 모듈로 실행하므로, forkserver 작업자가
+# 초기화 중 app.py 전체를 다시 실행하지 않도록 __main__ 모듈 이름(spec)만 전달되게 함
+__spec__ = ModuleSpec("__main__", None)
+
 
 # ============================================================
 # 상수 및 설정값
@@ -34,9 +56,20 @@ CACHE_FILENAME  = "site_list_cached.csv"
 LOGO_FILENAME   = "gslogo.png"
 KST             = pytz.timezone("Asia/Seoul")
 
-# 혹한기 작업 중지 기준 온도 (℃)
-TEMP_STOP_ALL   = -15   # 전면(옥내+옥외) 작업 중지
-TEMP_STOP_OUT   = -12   # 옥외 작업 중지
+# 초단기실황 강수형태(PTY) 코드 표시명 (관측 요소 순서는 work_rules.NOWCAST_CATEGORIES)
+PTY_LABELS = {1: "비", 2: "비/눈", 3: "눈", 5: "빗방울", 6: "빗방울눈날림", 7: "눈날림"}
+
+# 체감온도(기상청 겨울철 체감온도) 적용 조건
+WIND_CHILL_MAX_TEMP = 10.0   # 기온 10℃ 이하
+WIND_CHILL_MIN_WIND = 1.3    # 풍속 1.3m/s 이상
+
+# 격자 갱신 주기 (초단기실황 발표 횟수 기준, 1회 = 1시간)
+POLL_INTERVAL_MIN = 1                # 기준 온도 근접 격자: 매 발표마다 갱신
+POLL_INTERVAL_MAX = 3                # 여유 있는 격자: 최대 3회 발표마다 갱신
+POLL_MARGIN_NEAR  = 3.0              # 기준 온도까지 여유(℃) 이하 → 매 발표 갱신
+POLL_MARGIN_FAR   = 8.0              # 기준 온도까지 여유(℃) 초과 → 최대 주기
+POLL_COLD_HOURS   = range(0, 10)     # 최저기온 시간대(KST) → 주기 한 단계 단축
+POLL_HISTORY_LEN  = 6                # 추세 산출용 격자별 관측 이력 개수
 
 # 지도 기본 중심 좌표 (한반도 중심)
 MAP_DEFAULT_LAT = 36.3
@@ -47,16 +80,29 @@ MAP_DEFAULT_ZOOM = 7
 API_WEATHER_WARN  = "http://apis.data.go.kr/1360000/WthrWrnInfoService/getPwnStatus"
 API_ULTRA_FCST    = "http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getUltraSrtNcst"
 
-ALLOWED_WARNING_KEYWORDS = ["한파", "폭염", "호우", "대설", "태풍", "강풍"]
-ICON_MAP = {
-    "한파": "asterisk",
-    "건조": "fire",
-    "폭염": "sun",
-    "호우": "tint",
-    "대설": "snowflake-o",
-    "태풍": "bullseye",
-    "강풍": "flag",
-}
+# 현장 상태 표시 색상 (work_rules 상태 코드 순서, 요약 카드와 동일)
+STATUS_COLORS = ["#1976d2", "#ff9800", "#d32f2f", "#512da8"]
+
+# 분석 중간 결과 표시 (격자 N개 조회마다 요약·간이 지도·작업중지 목록 갱신)
+STREAM_BATCH_CELLS = 10
+
+SNAPSHOT_HISTORY_LEN = 288   # 프로세스 내 보관할 분석 스냅샷 개수
+ROLLUP_COLUMNS       = ["지역", "사업부"]   # 스냅샷별 집계 뷰를 만드는 그룹 컬럼
+
+# 렌더링 프로세스 풀
+RENDER_WORKERS      = 2      # 작업자 프로세스 수
+RENDER_QUEUE_MAX    = 4      # 동시에 대기/실행 가능한 렌더링 작업 수
+RENDER_RESULTS_MAX  = 8      # 보관할 완료 작업(결과) 수
+RENDER_POLL_SEC     = 1.0    # 렌더링 완료 확인 주기(초)
+
+# 포스터 형식 및 일괄 생성 기준 컬럼
+POSTER_FORMAT_LABELS = {"jpeg": "이미지(JPEG)", "svg": "벡터(SVG)"}
+POSTER_GROUP_COLUMNS = ROLLUP_COLUMNS
+
+# 오프라인 지명 사전 해석 수준이 이 값 이상이면 Nominatim 조회 생략 (3 = 읍/면/동).
+# 이보다 넓은 단위 좌표는 대략 위치로 표시하고 캐시에서도 재해석 대상으로 남김
+GAZETTEER_MIN_LEVEL = gazetteer.LEVEL_EMD
+GEO_LEVEL_COLUMN    = "좌표수준"
 
 geolocator = Nominatim(user_agent="korea_weather_guard_gs_final_update", timeout=15)
 
@@ -160,6 +206,13 @@ try:
     API_KEY_ENCODED  = st.secrets["api_key"]
     TELEGRAM_TOKEN   = st.secrets.get("telegram_token", None)
     TELEGRAM_CHAT_ID = st.secrets.get("telegram_chat_id", None)
+    # 지역/사업부별 추가 채팅방: [[telegram_routes]] column = "지역", value = "경기", chat_id = "..."
+    TELEGRAM_ROUTES  = [dict(r) for r in st.secrets.get("telegram_routes", [])]
+    TELEGRAM_AUTO_ALERT = bool(st.secrets.get("telegram_auto_alert", False))   # 분석 후 변동분 자동 전송
+    # 인증 없는 API이므로 기본은 로컬 전용. 외부 공개는 snapshot_api_host = "0.0.0.0" 등으로 직접 지정
+    SNAPSHOT_API_HOST = st.secrets.get("snapshot_api_host", "127.0.0.1")
+    SNAPSHOT_API_PORT = int(st.secrets.get("snapshot_api_port", 8502))   # 0이면 비활성화
+    WORK_RULES_SECRETS   = st.secrets["work_rules"].to_dict() if "work_rules" in st.secrets else {}
 except FileNotFoundError:
     st.error("secrets.toml 파일이 없거나 api_key가 설정되지 않았습니다.")
     st.stop()
@@ -173,6 +226,9 @@ _defaults = {
     "processed_data": None,
     "selected_site":  None,
     "analysis_done":  False,
+    "poster_batch":   None,
+    "poster_parts":   {},
+    "poster_zip":     None,
 }
 for key, val in _defaults.items():
     if key not in st.session_state:
@@ -188,8 +244,9 @@ def get_file_path(filename: str) -> str:
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
 
 
+@st.cache_resource
 def get_base64_of_bin_file(bin_file: str) -> str:
-    """바이너리 파일을 Base64 문자열로 인코딩"""
+    """바이너리 파일을 Base64 문자열로 인코딩 (파일당 1회)"""
     with open(bin_file, "rb") as f:
         return base64.b64encode(f.read()).decode()
 
@@ -203,48 +260,152 @@ def get_kst_now() -> datetime.datetime:
 # 텔레그램 알림 함수
 # ============================================================
 
-def send_telegram_alert(token: str, chat_id: str, message: str) -> tuple[bool, str]:
-    """텔레그램 메시지 전송. (성공 여부, 메시지) 튜플 반환"""
-    if not token or not chat_id:
-        return False, "텔레그램 토큰 또는 채팅방 ID가 설정되지 않았습니다."
+ALERT_TITLES = {
+    STATUS_STOP_ALL: "⛔ 옥외/옥내 작업중지",
+    STATUS_STOP_OUT: "🛑 옥외작업중지",
+    STATUS_WARNING:  "⚠️ 기상특보",
+}
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    try:
-        resp = requests.post(url, json={"chat_id": chat_id, "text": message}, timeout=5)
-        if resp.status_code == 200:
-            return True, "성공적으로 전송했습니다."
-        return False, f"전송 실패 (Status: {resp.status_code})"
-    except Exception as e:
-        return False, f"전송 중 오류 발생: {e}"
 
+def format_alert_time(df_proc: pd.DataFrame) -> str:
+    """알림 기준 시각 문자열 (최신 관측 시각, 관측값이 없으면 현재 시각)"""
+    ts = int(df_proc["obs_ts"].max()) if "obs_ts" in df_proc.columns and len(df_proc) else 0
+    if ts:
+        return f"기상청 {format_obs_ts(ts)} 관측 기준"
+    return get_kst_now().strftime("%Y년 %m월 %d일 %H:%M 기준")
 
-def build_telegram_message(df_proc: pd.DataFrame) -> str:
+
+def build_telegram_message(df_proc: pd.DataFrame, scope_label: str | None = None) -> str:
     """분석 완료된 DataFrame으로부터 텔레그램 전송 메시지 구성"""
-    now_str = get_kst_now().strftime("%Y년 %m월 %d일 %H:%M 기준")
+    now_str = format_alert_time(df_proc)
+    if scope_label:
+        now_str = f"{scope_label} · {now_str}"
     lines = [f"🚨 [GS건설 현장 기온 모니터링]\n{now_str}\n"]
 
-    if "temp_val" in df_proc.columns:
-        stop_all = df_proc[df_proc["temp_val"] <= TEMP_STOP_ALL]
-        stop_out = df_proc[(df_proc["temp_val"] > TEMP_STOP_ALL) & (df_proc["temp_val"] <= TEMP_STOP_OUT)]
-    else:
-        stop_all = stop_out = pd.DataFrame()
+    alerts = get_alert_states(df_proc)
+    temps  = dict(zip(df_proc["현장명"], df_proc["temp_val"]))
+    for code, title in ALERT_TITLES.items():
+        names = [name for name, c in alerts.items() if c == code]
+        if names:
+            lines.append(f"\n{title}: {len(names)}개소")
+            lines.extend(f" - {name} ({format_temp(temps[name])}℃)" for name in names)
 
-    if not stop_all.empty:
-        lines.append(f"\n⛔ 옥외/옥내 작업중지 ({TEMP_STOP_ALL}℃ 이하): {len(stop_all)}개소")
-        for _, row in stop_all.iterrows():
-            lines.append(f" - {row['현장명']} ({row['temp_val']}℃)")
+    if not alerts:
+        lines.append("\n✅ 현재 작업 중지 기준에 해당하는 현장이 없습니다.")
 
-    if not stop_out.empty:
-        lines.append(f"\n🛑 옥외작업중지 ({TEMP_STOP_OUT}℃ 이하): {len(stop_out)}개소")
-        for _, row in stop_out.iterrows():
-            lines.append(f" - {row['현장명']} ({row['temp_val']}℃)")
+    return "\n".join(lines)
 
-    if stop_all.empty and stop_out.empty:
-        lines.append(f"\n✅ 현재 혹한기 작업 중지 기준({TEMP_STOP_OUT}℃ 이하)에 해당하는 현장이 없습니다.")
 
+def get_alert_states(df_proc: pd.DataFrame) -> dict[str, int]:
+    """알림 대상 현장 {현장명: 상태 코드} (규칙 평가 결과의 alert 컬럼 기준)"""
+    alert = df_proc["alert"].to_numpy(dtype=bool)
+    codes = df_proc["status_label"].cat.codes.to_numpy()
+    return dict(zip(df_proc["현장명"].to_numpy()[alert], codes[alert].tolist()))
+
+
+def build_telegram_diff_message(df_proc: pd.DataFrame, previous: dict[str, int],
+                                scope_label: str | None = None) -> str | None:
+    """
+    직전 알림 대비 작업중지 진입/변경·해제 현장만 담은 메시지 구성.
+    변동이 없으면 None 반환.
+    """
+    current = get_alert_states(df_proc)
+    changed = {name: code for name, code in current.items() if previous.get(name) != code}
+    cleared = [name for name in previous if name not in current]
+    if not changed and not cleared:
+        return None
+
+    now_str = format_alert_time(df_proc)
+    if scope_label:
+        now_str = f"{scope_label} · {now_str}"
+    lines = [f"🚨 [GS건설 현장 기온 모니터링 · 변동]\n{now_str}\n"]
+
+    temps = dict(zip(df_proc["현장명"], df_proc["temp_val"]))
+    for code, title in ALERT_TITLES.items():
+        names = [name for name, c in changed.items() if c == code]
+        if names:
+            lines.append(f"\n{title} 신규·변경: {len(names)}개소")
+            lines.extend(f" - {name} ({format_temp(temps[name])}℃)" for name in names)
+
+    if cleared:
+        lines.append(f"\n✅ 작업중지 해제: {len(cleared)}개소")
+        lines.extend(
+            f" - {name} ({format_temp(temps[name])}℃)" if name in temps else f" - {name}"
+            for name in cleared
+        )
+    lines.append(f"\n현재 작업중지 현장: 총 {len(current)}개소")
     return "\n".join(lines)
 
 
+@st.cache_resource
+def get_alert_dispatcher() -> dict:
+    """텔레그램 발송기 (프로세스당 1개, 백그라운드 스레드에서 순차 전송)"""
+    return alert_dispatch.start_dispatcher(TELEGRAM_TOKEN)
+
+
+@st.cache_resource
+def get_alert_baseline() -> dict:
+    """
+    채팅방·조회 범위별 마지막으로 알린 작업중지 현장 (전체 세션 공유).
+    {'lock': Lock, 'sent': {(chat_id, 범위): {현장명: 상태 코드}}}
+    """
+    return {"lock": threading.Lock(), "sent": {}}
+
+
+def commit_alert_baseline(baseline: dict, key: tuple, states: dict[str, int], ok: bool) -> None:
+    """
+    발송 완료 콜백. 전송이 확인된 경우에만 해당 대상의 알림 기준을 갱신하므로,
+    최종 실패한 변동분은 다음 전송 때 다시 포함됨 (발송 스레드에서 호출)
+    """
+    if ok:
+        with baseline["lock"]:
+            baseline["sent"][key] = states
+
+
+def get_alert_routes(scope: tuple[str, str] | None) -> list[tuple[str, tuple[str, str] | None]]:
+    """
+    (채팅방, 조회 범위) 전송 대상 목록.
+    기본 채팅방은 현재 조회 범위, telegram_routes 채팅방은 각자 지정한 지역/사업부.
+    """
+    routes = [(str(TELEGRAM_CHAT_ID), scope)] if TELEGRAM_CHAT_ID else []
+    for route in TELEGRAM_ROUTES:
+        if route.get("chat_id") and route.get("column") in ROLLUP_COLUMNS:
+            routes.append((str(route["chat_id"]), (route["column"], str(route["value"]))))
+    return routes
+
+
+def dispatch_alerts(df_proc: pd.DataFrame, snapshot: dict, scope: tuple[str, str] | None,
+                    diff_only: bool = True) -> list[str]:
+    """
+    전송 대상별 메시지를 발송 대기열에 추가하고 대상별 결과 문구 목록 반환 (전송은 비동기).
+    diff_only면 직전 알림 대비 변동분만, 변동이 없으면 전송하지 않음.
+    알림 기준은 전송 완료가 확인된 뒤에만 갱신 (commit_alert_baseline).
+    """
+    dispatcher = get_alert_dispatcher()
+    baseline   = get_alert_baseline()
+    results    = []
+    for chat_id, route_scope in get_alert_routes(scope):
+        df_scope = select_scope(df_proc, snapshot, route_scope)
+        label    = format_scope(route_scope)
+        key      = (chat_id, route_scope)
+        with baseline["lock"]:
+            scope_label = label if route_scope else None
+            if diff_only:
+                msg = build_telegram_diff_message(df_scope, baseline["sent"].get(key, {}), scope_label)
+            else:
+                msg = build_telegram_message(df_scope, scope_label)
+
+            if msg is None:
+                results.append(f"{label}: 변동 없음")
+                continue
+            on_done = functools.partial(commit_alert_baseline, baseline, key, get_alert_states(df_scope))
+            if not alert_dispatch.enqueue_message(dispatcher, chat_id, msg, label=label, on_done=on_done):
+                results.append(f"{label}: 같은 내용 전송됨")
+                continue
+        results.append(f"{label}: 전송 대기열 추가")
+    return results
+
+
 # ============================================================
 # 기상청 API 연동 함수
 # ============================================================
@@ -274,64 +435,83 @@ def dfs_xy_conv(lat: float, lon: float) -> tuple[int, int]:
     return int(nx), int(ny)
 
 
-@st.cache_data(ttl=300)
-def get_current_temp(lat: float, lon: float) -> tuple[float | None, str | None]:
+def get_nowcast_base(now: datetime.datetime) -> datetime.datetime:
+    """현재 시각 기준 조회 가능한 최신 초단기실황 발표 시각(정시) 반환"""
+    # 정각 40분 이전이면 1시간 전 데이터 사용
+    target = now - datetime.timedelta(hours=1) if now.minute <= 40 else now
+    return target.replace(minute=0, second=0, microsecond=0)
+
+
+def format_obs_time(base: datetime.datetime) -> str:
+    """발표 시각 → '월일 HH:00' 형식의 관측 시각 문자열"""
+    return base.strftime("%m월 %d일 %H:00")
+
+
+def fetch_ultra_nowcast(nx: int, ny: int, base: datetime.datetime) -> dict[str, float] | None:
     """
-    기상청 초단기실황 API로 현재 기온 조회.
-    (기온값, '월일 HH:00' 형식의 관측 시각) 튜플 반환.
-    값이 없으면 (None, None) 반환.
+    기상청 초단기실황 API로 격자(nx, ny)의 전체 관측 요소 조회.
+    {'T1H': 기온, 'WSD': 풍속, 'REH': 습도, 'RN1': 강수량, 'PTY': 강수형태, ...}
+    기온(T1H)이 없으면 None 반환.
     """
     try:
-        nx, ny = dfs_xy_conv(lat, lon)
-        now = get_kst_now()
-        # 정각 40분 이전이면 1시간 전 데이터 사용
-        target = now - datetime.timedelta(hours=1) if now.minute <= 40 else now
-        base_date = target.strftime("%Y%m%d")
-        base_time = target.strftime("%H00")
-
         params = (
             f"?serviceKey={API_KEY_ENCODED}"
             f"&pageNo=1&numOfRows=10&dataType=JSON"
-            f"&base_date={base_date}&base_time={base_time}"
+            f"&base_date={base.strftime('%Y%m%d')}&base_time={base.strftime('%H00')}"
             f"&nx={nx}&ny={ny}"
         )
         resp = requests.get(API_ULTRA_FCST + params, timeout=2)
         data = resp.json()
 
         if data["response"]["header"]["resultCode"] == "00":
+            obs = {}
             for item in data["response"]["body"]["items"]["item"]:
-                if item["category"] == "T1H":
-                    time_label = f"{base_date[4:6]}월 {base_date[6:8]}일 {base_time[:2]}:00"
-                    return float(item["obsrValue"]), time_label
+                if item["category"] not in NOWCAST_INDEX:
+                    continue
+                try:
+                    obs[item["category"]] = float(item["obsrValue"])
+                except (TypeError, ValueError):
+                    continue  # '강수없음' 등 수치가 아닌 값
+            if "T1H" in obs:
+                return obs
     except Exception:
         pass
-    return None, None
+    return None
 
 
-def get_weather_warning_text() -> str | None:
-    """기상청 특보 전문 텍스트 조회"""
-    url = f"{API_WEATHER_WARN}?serviceKey={API_KEY_ENCODED}&numOfRows=10&pageNo=1&dataType=JSON"
+def get_weather_warning_bulletin() -> dict | None:
+    """
+    기상청 특보 현황 전문 조회.
+    {'text': 전문, 'tm_fc': 발표시각, 'tm_seq': 발표번호, 'hash': 전문 해시} 반환.
+    """
+    url = f"{API_WEATHER_WARN}?serviceKey={API_KEY_ENCODED}&numOfRows=1&pageNo=1&dataType=JSON"
     try:
         resp = requests.get(url, timeout=5)
         data = resp.json()
         items = data["response"]["body"]["items"]["item"]
         if items:
-            return items[0].get("t6", "")
+            text = items[0].get("t6", "") or ""
+            return {
+                "text":   text,
+                "tm_fc":  str(items[0].get("tmFc", "")),
+                "tm_seq": items[0].get("tmSeq"),
+                "hash":   hashlib.sha1(text.encode("utf-8")).hexdigest(),
+            }
     except Exception:
         pass
     return None
 
 
-def analyze_warnings(full_text: str, keywords: list[str]) -> list[str]:
+def parse_warning_sections(full_text: str) -> dict[str, str]:
     """
-    특보 전문(full_text)에서 지역 키워드(keywords)에 해당하는 특보 목록 추출.
+    특보 전문(full_text)을 {특보명: 발효 구역 문자열} 딕셔너리로 분리.
     건조 특보는 제외하고, ALLOWED_WARNING_KEYWORDS에 포함된 유형만 반환.
     """
     if not full_text:
-        return []
+        return {}
 
     clean_text = full_text.replace("\r", " ").replace("\n", " ")
-    detected = []
+    sections: dict[str, str] = {}
 
     for match in re.finditer(r"o\s*([^:]+)\s*:\s*(.*?)(?=o\s|$)", clean_text):
         w_name  = match.group(1).strip()
@@ -345,40 +525,313 @@ def analyze_warnings(full_text: str, keywords: list[str]) -> list[str]:
         if not any(kw in w_name for kw in ALLOWED_WARNING_KEYWORDS):
             continue
 
-        # 지역 키워드 매칭
-        if any(kw in content for kw in keywords):
-            detected.append(w_name)
+        sections[w_name] = f"{sections[w_name]} {content}" if w_name in sections else content
+
+    return sections
+
+
+def match_warnings(sections: dict[str, str], keywords: list[str]) -> list[str]:
+    """특보 구역 딕셔너리에서 지역 키워드가 포함된 특보명 목록 반환"""
+    return [
+        w_name for w_name, content in sections.items()
+        if any(kw in content for kw in keywords)
+    ]
+
+
+def parse_bulletin_time(tm_fc: str) -> datetime.datetime | None:
+    """특보 발표시각('YYYYMMDDHHMM') → KST datetime 변환"""
+    try:
+        return KST.localize(datetime.datetime.strptime(tm_fc[:12], "%Y%m%d%H%M"))
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================
+# 특보 전문 변경 감지
+# ============================================================
+
+@st.cache_resource
+def get_bulletin_store() -> dict:
+    """
+    직전 특보 전문 및 현장별 특보 매칭 결과 저장소 (전체 세션 공유).
+    {'lock', 'hash', 'tm_fc', 'tm_seq', 'changed_at', 'sections', 'assignments': {현장명: [특보명, ...]}}
+    읽기/쓰기는 반드시 'lock'을 잡고 수행.
+    """
+    return {"lock": threading.Lock()}
+
+
+def get_bulletin_key(tm_fc, tm_seq) -> tuple[str, int]:
+    """특보 전문 선후 비교용 키 (발표시각, 발표번호)"""
+    try:
+        seq = int(tm_seq)
+    except (TypeError, ValueError):
+        seq = -1
+    return str(tm_fc or ""), seq
+
+
+def get_bulletin_info() -> dict:
+    """저장된 최신 특보 전문의 발표 정보 {'tm_fc', 'tm_seq', 'changed_at'} (없으면 빈 딕셔너리)"""
+    store = get_bulletin_store()
+    with store["lock"]:
+        return {key: store[key] for key in ("tm_fc", "tm_seq", "changed_at") if key in store}
+
+
+def assign_site_warnings(bulletin: dict | None,
+                         site_keywords: dict[str, list[str]]) -> dict[str, list[str]]:
+    """
+    현장별 발효 특보 목록 산출.
+    전문이 직전과 같으면 이전 매칭 결과를 그대로 재사용하고, 변경 시에는
+    변경된 특보 구역(이전/현재)에 지역 키워드가 포함된 현장만 다시 매칭.
+    저장된 전문보다 오래된 전문이면 저장소는 건드리지 않고 해당 전문으로만 매칭.
+    """
+    if bulletin is None:
+        return {site: [] for site in site_keywords}
+
+    store = get_bulletin_store()
+    with store["lock"]:
+        if "hash" in store and (get_bulletin_key(bulletin["tm_fc"], bulletin["tm_seq"])
+                                < get_bulletin_key(store["tm_fc"], store["tm_seq"])):
+            sections = parse_warning_sections(bulletin["text"])
+            return {site: match_warnings(sections, keywords) for site, keywords in site_keywords.items()}
+
+        prev = store.get("assignments", {})
+        if bulletin["hash"] == store.get("hash"):
+            sections     = store["sections"]
+            changed_text = ""
+        else:
+            sections     = parse_warning_sections(bulletin["text"])
+            old_sections = store.get("sections", {})
+            changed_text = " ".join(
+                f"{old_sections.get(name, '')} {sections.get(name, '')}"
+                for name in set(old_sections) | set(sections)
+                if old_sections.get(name) != sections.get(name)
+            )
+            store.update({
+                "hash":       bulletin["hash"],
+                "tm_fc":      bulletin["tm_fc"],
+                "tm_seq":     bulletin["tm_seq"],
+                "changed_at": parse_bulletin_time(bulletin["tm_fc"]),
+                "sections":   sections,
+            })
+
+        result = {}
+        for site, keywords in site_keywords.items():
+            if site in prev and not any(kw in changed_text for kw in keywords):
+                result[site] = prev[site]
+            else:
+                result[site] = match_warnings(sections, keywords)
 
-    return list(set(detected))
+        store["assignments"] = {**prev, **result}
+    return result
+
+
+# ============================================================
+# 격자 갱신 스케줄러
+# ============================================================
+
+@st.cache_resource
+def get_grid_cell_store() -> dict:
+    """
+    격자(nx, ny)별 최근 관측 상태 저장소 (전체 세션 공유).
+    {(nx, ny): {'temp': 기온, 'obs': {관측 요소: 값}, 'base': 발표시각,
+                'history': [(발표시각, 기온), ...]}}
+    """
+    return {}
+
+
+def get_cell_trend(history: list[tuple[datetime.datetime, float]]) -> float:
+    """관측 이력으로부터 발표 1회(1시간)당 기온 변화량(℃) 산출"""
+    if len(history) < 2:
+        return 0.0
+    (t0, v0), (t1, v1) = history[0], history[-1]
+    hours = (t1 - t0).total_seconds() / 3600
+    return (v1 - v0) / hours if hours > 0 else 0.0
+
+
+def compute_poll_interval(temp: float | None, trend: float,
+                          has_warning: bool, hour: int) -> int:
+    """
+    격자 갱신 주기(발표 횟수) 산정.
+    작업중지 기준 온도(사업부/지역별 기준 포함)에 가깝거나 추세상 기준을 지나칠 격자,
+    특보 발효 격자는 매 발표마다 갱신하고 여유 있는 격자는 덜 자주 갱신.
+    """
+    if temp is None or has_warning:
+        return POLL_INTERVAL_MIN
+
+    # 최대 주기 동안 예상되는 기온 구간과 기준 온도 사이의 거리
+    lo, hi = sorted((temp, temp + trend * POLL_INTERVAL_MAX))
+    margin = min(
+        0.0 if lo <= th <= hi else min(abs(lo - th), abs(hi - th))
+        for th in get_rule_thresholds()
+    )
+
+    if margin <= POLL_MARGIN_NEAR:
+        interval = POLL_INTERVAL_MIN
+    elif margin <= POLL_MARGIN_FAR:
+        interval = POLL_INTERVAL_MIN + 1
+    else:
+        interval = POLL_INTERVAL_MAX
+
+    # 새벽/아침 최저기온 시간대에는 한 단계 더 자주 갱신
+    if hour in POLL_COLD_HOURS:
+        interval = max(POLL_INTERVAL_MIN, interval - 1)
+    return interval
+
+
+def is_cell_due(state: dict | None, base: datetime.datetime,
+                has_warning: bool, hour: int) -> bool:
+    """격자가 이번 발표 시각(base)에 갱신 대상인지 여부"""
+    if state is None:
+        return True
+    elapsed = int((base - state["base"]).total_seconds() // 3600)
+    if elapsed <= 0:
+        return False
+    trend    = get_cell_trend(state["history"])
+    interval = compute_poll_interval(state["temp"], trend, has_warning, hour)
+    return elapsed >= interval
+
+
+def get_warning_priority(mask: int) -> int:
+    """특보 비트마스크 → 조회 우선순위 (한파 > 기타, 경보 > 주의보 > 예비특보, 없으면 0)"""
+    level_rank = {"경보": 3, "주의보": 2, "예비특보": 1}
+    return max(
+        (level_rank[WARNING_LEVELS[bit % len(WARNING_LEVELS)]] + (10 if w_name.startswith("한파") else 0)
+         for bit, w_name in enumerate(WARNING_TYPES) if int(mask) >> bit & 1),
+        default=0,
+    )
+
+
+def get_cell_fetch_order(cell: tuple[int, int], warn_mask: int, state: dict | None,
+                         prev_status: int) -> tuple:
+    """
+    격자 조회 순서 키 (작을수록 먼저).
+    특보 심각도 > 직전 스냅샷 상태 > 직전 기온(낮은 순). 관측 이력이 없는 격자(콜드 스타트)는
+    기온 대신 북쪽(ny가 큰) 격자부터 조회.
+    """
+    head = (-get_warning_priority(warn_mask), -prev_status)
+    if state is not None:
+        return (*head, 0, state["temp"])
+    return (*head, 1, -cell[1])
+
+
+def refresh_grid_cells(cells: dict[tuple[int, int], int], on_progress=None, on_batch=None,
+                       prev_status: dict[tuple[int, int], int] | None = None) -> dict[tuple[int, int], dict | None]:
+    """
+    갱신 우선순위에 따라 대상 격자만 기상청 API로 조회하고 격자별 상태 반환.
+    특보가 심각한 격자, 직전 상태가 심각한 격자, 직전 기온이 낮은 격자 순으로 조회해
+    심각한 현장부터 결과가 나오게 함 (get_cell_fetch_order).
+
+    Parameters
+    ----------
+    cells       : {(nx, ny): 특보 비트마스크} 딕셔너리
+    on_progress : (완료 수, 전체 수) 를 받는 진행 상황 콜백
+    on_batch    : STREAM_BATCH_CELLS개 조회마다 (완료 수, 전체 수, 격자별 상태) 를 받는 콜백
+    prev_status : {(nx, ny): 직전 스냅샷의 격자 내 최고 상태 코드} (없으면 -1로 간주)
+    """
+    store = get_grid_cell_store()
+    now   = get_kst_now()
+    base  = get_nowcast_base(now)
+
+    prev_status = prev_status or {}
+    due = [
+        cell for cell, warn_mask in cells.items()
+        if is_cell_due(store.get(cell), base, bool(warn_mask), now.hour)
+    ]
+    due.sort(key=lambda cell: get_cell_fetch_order(
+        cell, cells[cell], store.get(cell), prev_status.get(cell, -1)
+    ))
+
+    for i, (nx, ny) in enumerate(due):
+        if on_progress:
+            on_progress(i + 1, len(due))
+        obs = fetch_ultra_nowcast(nx, ny, base)
+        if obs is None:
+            continue  # 조회 실패 시 이전 관측값 유지
+
+        temp    = obs["T1H"]
+        prev    = store.get((nx, ny))
+        history = [h for h in (prev["history"] if prev else []) if h[0] != base]
+        history.append((base, temp))
+        store[(nx, ny)] = {
+            "temp":    temp,
+            "obs":     obs,
+            "base":    base,
+            "history": history[-POLL_HISTORY_LEN:],
+        }
+
+        if on_batch and (i + 1) % STREAM_BATCH_CELLS == 0 and i + 1 < len(due):
+            on_batch(i + 1, len(due), {cell: store.get(cell) for cell in cells})
+
+    return {cell: store.get(cell) for cell in cells}
 
 
 # ============================================================
 # 좌표 변환 함수
 # ============================================================
 
-def get_coordinates(address: str) -> tuple[float | None, float | None]:
-    """주소 문자열 → (위도, 경도) 변환. 변환 실패 시 (None, None) 반환"""
+@st.cache_resource
+def get_gazetteer_index() -> dict:
+    """오프라인 지명 사전 색인 (프로세스당 1회 로드)"""
+    return gazetteer.load_gazetteer(get_file_path(gazetteer.GAZETTEER_FILENAME))
+
+
+def get_coordinates(address: str) -> tuple[float | None, float | None, int]:
+    """
+    주소 문자열 → (위도, 경도, 해석 수준) 변환. 변환 실패 시 (None, None, LEVEL_NONE) 반환.
+    오프라인 지명 사전에서 읍/면/동까지 해석되면 바로 사용하고, 그보다 넓은 단위만
+    해석되면 Nominatim으로 정밀 조회. 조회 결과가 사전보다 상세하지 않으면 사전 좌표를
+    해석 수준과 함께 반환하므로, 호출 측은 수준을 보고 대략 위치임을 표시해야 함.
+    """
     if pd.isna(address) or str(address).strip() == "":
-        return None, None
+        return None, None, gazetteer.LEVEL_NONE
 
     clean_addr = re.sub(r"\([^)]*\)", "", str(address)).strip()
+    local = gazetteer.resolve_address(get_gazetteer_index(), clean_addr)
+    if local and local[2] >= GAZETTEER_MIN_LEVEL:
+        return local
+
+    # 후보별 해석 수준: 전체 주소 > 앞 3어절(읍면동·도로) > 앞 2어절(시군구)
     tokens = clean_addr.split()
-    candidates = [clean_addr]
+    candidates = [(clean_addr, gazetteer.LEVEL_EXACT)]
     if len(tokens) > 3:
-        candidates.append(" ".join(tokens[:3]))
+        candidates.append((" ".join(tokens[:3]), gazetteer.LEVEL_EMD))
     if len(tokens) >= 2:
-        candidates.append(" ".join(tokens[:2]))
+        candidates.append((" ".join(tokens[:2]), gazetteer.LEVEL_SIGUNGU))
 
-    for cand in candidates:
+    local_level = local[2] if local else gazetteer.LEVEL_NONE
+    for cand, level in candidates:
+        if level <= local_level:
+            break
         try:
             location = geolocator.geocode(cand)
             if location:
-                return location.latitude, location.longitude
+                return location.latitude, location.longitude, level
             time.sleep(0.3)
         except Exception:
             time.sleep(0.5)
 
-    return None, None
+    if local:
+        return local
+    return None, None, gazetteer.LEVEL_NONE
+
+
+def refine_coarse_coordinates(df: pd.DataFrame) -> bool:
+    """
+    캐시된 현장 중 읍/면/동보다 넓은 단위 좌표만 오프라인 사전으로 다시 해석.
+    더 상세한 좌표로 바뀐 현장이 있으면 True (Nominatim 재조회는 위치 재분석 시에만 수행)
+    """
+    changed = False
+    coarse  = df[GEO_LEVEL_COLUMN].fillna(gazetteer.LEVEL_NONE) < GAZETTEER_MIN_LEVEL
+    for idx in df.index[coarse]:
+        addr = df.at[idx, "주소"]
+        if pd.isna(addr) or str(addr).strip() == "":
+            continue
+        local   = gazetteer.resolve_address(get_gazetteer_index(), re.sub(r"\([^)]*\)", "", str(addr)).strip())
+        current = df.at[idx, GEO_LEVEL_COLUMN]
+        if local and local[2] > (gazetteer.LEVEL_NONE if pd.isna(current) else current):
+            df.loc[idx, ["lat", "lon", GEO_LEVEL_COLUMN]] = local
+            changed = True
+    return changed
 
 
 # ============================================================
@@ -394,10 +847,13 @@ def load_site_data() -> pd.DataFrame:
     excel_path = get_file_path(EXCEL_FILENAME)
     cache_path = get_file_path(CACHE_FILENAME)
 
-    # 캐시 파일 우선 사용
+    # 캐시 파일 우선 사용 (대략 위치 현장은 지명 사전으로 재해석 후 변경 시 다시 저장)
     if os.path.exists(cache_path):
         try:
-            return pd.read_csv(cache_path)
+            df = pd.read_csv(cache_path)
+            if GEO_LEVEL_COLUMN in df.columns and refine_coarse_coordinates(df):
+                df.to_csv(cache_path, index=False, encoding="utf-8-sig")
+            return df
         except Exception:
             pass
 
@@ -415,18 +871,20 @@ def load_site_data() -> pd.DataFrame:
             # 좌표 컬럼이 없거나 모두 비어있을 때만 변환 수행
             if "lat" not in df.columns or df["lat"].isnull().all():
                 with st.status("🚀 최초 1회 위치 분석 중...", expanded=True) as status:
-                    lats, lons = [], []
+                    lats, lons, levels = [], [], []
                     total = len(df)
                     for i, addr in enumerate(df["주소"]):
                         if i % 10 == 0:
                             status.update(label=f"주소 변환 중... ({i}/{total})")
-                        lat, lon = get_coordinates(addr)
+                        lat, lon, level = get_coordinates(addr)
                         lats.append(lat)
                         lons.append(lon)
+                        levels.append(level)
                     status.update(label="✅ 분석 완료!", state="complete", expanded=False)
 
                 df["lat"] = lats
                 df["lon"] = lons
+                df[GEO_LEVEL_COLUMN] = levels
                 df.to_csv(cache_path, index=False, encoding="utf-8-sig")
 
         return df
@@ -436,41 +894,383 @@ def load_site_data() -> pd.DataFrame:
         return pd.DataFrame()
 
 
+# ============================================================
+# 작업 통제 규칙 설정 (평가는 work_rules 모듈)
+# ============================================================
+
+@st.cache_resource
+def load_work_rules() -> tuple[dict, list[str]]:
+    """
+    작업 통제 규칙 설정 (기본값 + secrets [work_rules] 덮어쓰기, 프로세스당 1회).
+    (규칙, 설정 오류 목록) 반환. 설정이 잘못되면 기본 규칙(WORK_RULES_DEFAULT)으로 대체
+    """
+    rules = copy.deepcopy(WORK_RULES_DEFAULT)
+    for key, value in WORK_RULES_SECRETS.items():
+        if isinstance(rules.get(key), dict) and isinstance(value, dict):
+            rules[key].update(value)
+        else:
+            rules[key] = value
+
+    errors = validate_work_rules(rules)
+    return (copy.deepcopy(WORK_RULES_DEFAULT) if errors else rules), errors
+
+
+def get_work_rules() -> dict:
+    """적용 중인 작업 통제 규칙 (검증 통과한 설정 또는 기본 규칙)"""
+    return load_work_rules()[0]
+
+
+def get_rule_thresholds() -> list[float]:
+    """설정된 모든 작업중지 기준 온도 (기본값 + 사업부/지역별 기준)"""
+    rules  = get_work_rules()
+    values = {rules["temp"]["stop_all"], rules["temp"]["stop_out"]}
+    for override in rules["overrides"]:
+        values.update(override[k] for k in ("stop_all", "stop_out") if k in override)
+    return sorted(values)
+
+
+def get_previous_status(previous: dict | None, sites: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """직전 스냅샷에서 현장명 기준으로 (상태 코드, 상태 시작 시각) 배열 추출. 없으면 (-1, 0)"""
+    n_sites = len(sites)
+    if previous is None or "status_since" not in previous["table"].columns:
+        return np.full(n_sites, -1, dtype=np.int8), np.zeros(n_sites, dtype=np.uint32)
+
+    table = previous["table"]
+    prev  = pd.DataFrame({
+        "code":  table["status_label"].cat.codes.to_numpy(),
+        "since": table["status_since"].to_numpy(),
+    }, index=previous["site_names"])
+    prev  = prev[~prev.index.duplicated()].reindex(sites["현장명"].to_numpy())
+    return (
+        prev["code"].fillna(-1).to_numpy(dtype=np.int8),
+        prev["since"].fillna(0).to_numpy(dtype=np.uint32),
+    )
+
+
+# ============================================================
+# 분석 스냅샷 (압축 저장 & 표시용 변환)
+# ============================================================
+
+def encode_warnings(warnings: list[str]) -> int:
+    """특보명 목록 → WARNING_TYPES 기준 비트마스크"""
+    mask = 0
+    for w_name in warnings:
+        kw = next((k for k in ALLOWED_WARNING_KEYWORDS if k in w_name), None)
+        if kw is None:
+            continue
+        if "예비" in w_name:
+            level = "예비특보"
+        elif "경보" in w_name:
+            level = "경보"
+        else:
+            level = "주의보"
+        mask |= 1 << WARNING_TYPES.index(f"{kw}{level}")
+    return mask
+
+
+def decode_warnings(mask: int) -> list[str]:
+    """비트마스크 → 특보명 목록"""
+    mask = int(mask)
+    return [w_name for bit, w_name in enumerate(WARNING_TYPES) if mask >> bit & 1]
+
+
+def format_temp(temp: float) -> str:
+    """기온 표시 문자열 (소수점 1자리)"""
+    return f"{float(temp):.1f}" if pd.notna(temp) else "-"
+
+
+def format_obs_ts(ts: int) -> str | None:
+    """관측 시각 타임스탬프(UNIX 초) → '월일 HH:00' 문자열. 0이면 None"""
+    if not ts:
+        return None
+    return format_obs_time(datetime.datetime.fromtimestamp(int(ts), KST))
+
+
+def format_value(value: float, unit: str, digits: int = 1) -> str:
+    """관측값 표시 문자열 (결측이면 '-')"""
+    return f"{float(value):.{digits}f}{unit}" if pd.notna(value) else "-"
+
+
+def decode_controls(mask: int) -> list[dict]:
+    """작업 통제 비트마스크 → 통제 항목(name, message 등) 목록"""
+    mask = int(mask)
+    return [rule for bit, rule in enumerate(get_work_rules()["controls"]) if mask >> bit & 1]
+
+
+def build_snapshot_table(obs: np.ndarray, obs_ts: np.ndarray, warn_masks: np.ndarray,
+                         sites: pd.DataFrame, previous: dict | None = None) -> pd.DataFrame:
+    """
+    분석 결과를 압축 컬럼으로 구성 (obs: 현장 × NOWCAST_CATEGORIES 관측 행렬).
+    temp_val·feels_val·wind_val·humid_val·rain_val(float32, 결측 NaN) / pty_code(uint8)
+    obs_ts·status_since(uint32) / warn_mask(uint32) / ctrl_mask(uint8) / alert(bool)
+    status_label·marker_color·marker_icon(범주형)
+    상태·통제·지도 표시·알림 여부는 규칙 엔진 1회 평가 결과 (previous: 히스테리시스용 직전 스냅샷)
+    """
+    temps    = obs[:, NOWCAST_INDEX["T1H"]]
+    winds    = obs[:, NOWCAST_INDEX["WSD"]]
+    compiled = compile_work_rules(get_work_rules(), sites)
+    result   = evaluate_work_rules(
+        compiled, obs, obs_ts, warn_masks, *get_previous_status(previous, sites)
+    )
+    return pd.DataFrame({
+        "temp_val":     temps.astype(np.float32),
+        "feels_val":    compute_wind_chill(temps, winds),
+        "wind_val":     winds.astype(np.float32),
+        "humid_val":    obs[:, NOWCAST_INDEX["REH"]].astype(np.float32),
+        "rain_val":     obs[:, NOWCAST_INDEX["RN1"]].astype(np.float32),
+        "pty_code":     np.nan_to_num(obs[:, NOWCAST_INDEX["PTY"]]).astype(np.uint8),
+        "obs_ts":       obs_ts.astype(np.uint32),
+        "warn_mask":    warn_masks.astype(np.uint32),
+        "ctrl_mask":    result["ctrl_mask"],
+        "status_label": pd.Categorical.from_codes(result["status"], categories=STATUS_LABELS),
+        "status_since": result["since"],
+        "marker_color": pd.Categorical.from_codes(result["color"], categories=MARKER_COLORS),
+        "marker_icon":  pd.Categorical.from_codes(result["icon"], categories=MARKER_ICONS),
+        "alert":        result["alert"],
+    }, index=sites.index)
+
+
+@st.cache_resource
+def get_snapshot_store() -> dict:
+    """분석 스냅샷 저장소 (전체 세션 공유). 최근 SNAPSHOT_HISTORY_LEN개 보관"""
+    return {
+        "lock":    threading.Lock(),
+        "seq":     0,
+        "history": collections.deque(maxlen=SNAPSHOT_HISTORY_LEN),
+    }
+
+
+def count_statuses(codes: np.ndarray) -> dict[str, int]:
+    """상태 코드 배열 → 요약 건수 딕셔너리"""
+    counts = np.bincount(codes, minlength=len(STATUS_LABELS))
+    return {
+        "현장 수":      int(len(codes)),
+        "전면작업중지": int(counts[STATUS_STOP_ALL]),
+        "옥외작업중지": int(counts[STATUS_STOP_OUT]),
+        "기상특보":     int(counts[STATUS_WARNING]),
+    }
+
+
+def build_rollups(sites: pd.DataFrame, table: pd.DataFrame) -> dict[str, dict]:
+    """
+    지역/사업부별 집계 뷰 생성 (스냅샷당 1회).
+    {컬럼명: {'view': 그룹별 집계 DataFrame, 'positions': {그룹명: 행 위치 배열}}}
+    """
+    codes   = table["status_label"].cat.codes.to_numpy()
+    rollups = {}
+    for col in ROLLUP_COLUMNS:
+        if col not in sites.columns:
+            continue
+
+        frame = pd.DataFrame({
+            "key":  sites[col].fillna("미지정").astype(str).to_numpy(),
+            "code": codes,
+            "temp": table["temp_val"].to_numpy(),
+            "mask": table["warn_mask"].to_numpy(),
+        })
+        grouped = frame.groupby("key", sort=True)
+        counts  = pd.crosstab(frame["key"], frame["code"]).reindex(
+            columns=range(len(STATUS_LABELS)), fill_value=0
+        )
+
+        view = pd.DataFrame({
+            "현장 수":      grouped.size(),
+            "전면작업중지": counts[STATUS_STOP_ALL],
+            "옥외작업중지": counts[STATUS_STOP_OUT],
+            "기상특보":     counts[STATUS_WARNING],
+            "최저기온":     grouped["temp"].min().astype(np.float32),
+            "평균기온":     grouped["temp"].mean().astype(np.float32),
+            "warn_mask":    grouped["mask"].agg(np.bitwise_or.reduce).astype(np.uint32),
+        })
+        view.index.name = col
+        rollups[col] = {"view": view, "positions": grouped.indices}
+    return rollups
+
+
+def publish_snapshot(table: pd.DataFrame, sites: pd.DataFrame) -> dict:
+    """
+    분석 결과 테이블을 스냅샷으로 등록 후 반환.
+    {'id', 'created_at', 'table', 'site_names', 'summary', 'rollups'}
+    """
+    summary = count_statuses(table["status_label"].cat.codes.to_numpy())
+    rollups = build_rollups(sites, table)
+
+    store = get_snapshot_store()
+    with store["lock"]:
+        store["seq"] += 1
+        snapshot = {
+            "id":         store["seq"],
+            "created_at": get_kst_now(),
+            "table":      table,
+            "site_names": sites["현장명"].to_numpy(),
+            "summary":    summary,
+            "rollups":    rollups,
+        }
+        store["history"].append(snapshot)
+    return snapshot
+
+
+def get_latest_snapshot() -> dict | None:
+    """가장 최근에 등록된 스냅샷 (없으면 None)"""
+    store = get_snapshot_store()
+    with store["lock"]:
+        return store["history"][-1] if store["history"] else None
+
+
+def expand_snapshot(sites: pd.DataFrame, snapshot: dict) -> pd.DataFrame:
+    """
+    현장 목록과 스냅샷 결합 (렌더링 시점 전용).
+    현장별 기준 온도(th_out/th_all)는 설정과 사업부/지역으로 정해지므로
+    스냅샷에 보관하지 않고 여기서 규칙을 컴파일해 붙인다.
+    """
+    compiled = compile_work_rules(get_work_rules(), sites)
+    return sites.join(snapshot["table"]).assign(th_out=compiled["th_out"], th_all=compiled["th_all"])
+
+
+def get_session_scope() -> tuple[str, str] | None:
+    """세션에서 선택한 조회 범위 (컬럼명, 그룹명). 전체면 None"""
+    col, value = st.session_state.get("scope_col"), st.session_state.get("scope_value")
+    if col in ROLLUP_COLUMNS and value:
+        return col, value
+    return None
+
+
+def select_scope(df_sites: pd.DataFrame, snapshot: dict, scope: tuple[str, str] | None) -> pd.DataFrame:
+    """집계 뷰의 그룹별 행 위치로 조회 범위에 해당하는 현장만 추출"""
+    if scope is None:
+        return df_sites
+    col, value = scope
+    positions = snapshot["rollups"].get(col, {}).get("positions", {}).get(value)
+    if positions is None:
+        return df_sites.iloc[0:0]
+    return df_sites.iloc[positions]
+
+
+def get_scope_summary(snapshot: dict, scope: tuple[str, str] | None) -> dict[str, int]:
+    """조회 범위의 요약 건수 (집계 뷰에서 조회)"""
+    if scope is None:
+        return snapshot["summary"]
+    col, value = scope
+    view = snapshot["rollups"].get(col, {}).get("view")
+    if view is None or value not in view.index:
+        return count_statuses(np.array([], dtype=np.int8))
+    row = view.loc[value]
+    return {key: int(row[key]) for key in ("현장 수", "전면작업중지", "옥외작업중지", "기상특보")}
+
+
+def format_scope(scope: tuple[str, str] | None) -> str:
+    """조회 범위 표시 문자열"""
+    return "전체 현장" if scope is None else f"{scope[0]} {scope[1]}"
+
+
+# ============================================================
+# 스냅샷 JSON API (외부 시스템 연동)
+# ============================================================
+
+@st.cache_resource
+def get_snapshot_server():
+    """
+    스냅샷 API 서버 (프로세스당 1개).
+    포트 사용 중 등 시작 실패 시 OSError를 그대로 올려 캐시되지 않게 함 (다음 게시 때 재시도)
+    """
+    return snapshot_api.start_snapshot_server(SNAPSHOT_API_HOST, SNAPSHOT_API_PORT)
+
+
+def build_snapshot_payload(sites: pd.DataFrame, snapshot: dict) -> dict:
+    """스냅샷 → JSON 직렬화용 딕셔너리 (현장·상태·기온·특보·요약·집계)"""
+    table = snapshot["table"]
+    bulletin = get_bulletin_info()
+
+    def _temp(value) -> float | None:
+        return round(float(value), 1) if pd.notna(value) else None
+
+    def _value(value):
+        return None if pd.isna(value) else value
+
+    site_rows = []
+    def _time(ts) -> str | None:
+        return datetime.datetime.fromtimestamp(int(ts), KST).isoformat() if ts else None
+
+    def _location(level) -> str | None:
+        # 좌표 해석 수준 (이전 캐시처럼 수준 정보가 없으면 None)
+        return gazetteer.LEVEL_LABELS.get(int(level)) if pd.notna(level) else None
+
+    for (_, site), row in zip(sites.iterrows(), table.itertuples(index=False)):
+        site_rows.append({
+            "name":        site["현장명"],
+            "region":      _value(site.get("지역")),
+            "division":    _value(site.get("사업부")),
+            "address":     _value(site.get("주소")),
+            "lat":         _value(site["lat"]),
+            "lon":         _value(site["lon"]),
+            "location":    _location(site.get(GEO_LEVEL_COLUMN)),
+            "status":      row.status_label,
+            "status_since": _time(row.status_since),
+            "alert":       bool(row.alert),
+            "temp":        _temp(row.temp_val),
+            "feels_like":  _temp(row.feels_val),
+            "wind_speed":  _temp(row.wind_val),
+            "humidity":    _temp(row.humid_val),
+            "rain_1h":     _temp(row.rain_val),
+            "precip_type": PTY_LABELS.get(int(row.pty_code)),
+            "observed_at": _time(row.obs_ts),
+            "warnings":    decode_warnings(row.warn_mask),
+            "work_controls": [c["name"] for c in decode_controls(row.ctrl_mask)],
+        })
+
+    rollups = {
+        col: [
+            {
+                "name":     name,
+                **{key: int(row[key]) for key in ("현장 수", "전면작업중지", "옥외작업중지", "기상특보")},
+                "min_temp":  _temp(row["최저기온"]),
+                "mean_temp": _temp(row["평균기온"]),
+                "warnings":  decode_warnings(row["warn_mask"]),
+            }
+            for name, row in rollup["view"].iterrows()
+        ]
+        for col, rollup in snapshot["rollups"].items()
+    }
+
+    return {
+        "summary":  snapshot["summary"],
+        "bulletin": {
+            "tm_fc":      bulletin.get("tm_fc"),
+            "tm_seq":     bulletin.get("tm_seq"),
+            "changed_at": bulletin["changed_at"].isoformat() if bulletin.get("changed_at") else None,
+        },
+        "sites":    site_rows,
+        "rollups":  rollups,
+    }
+
+
+def publish_snapshot_api(sites: pd.DataFrame, snapshot: dict) -> None:
+    """스냅샷 API 응답 갱신 (JSON·gzip·ETag를 게시 시 1회만 생성). 비활성화·서버 시작 실패 시 생략"""
+    if not SNAPSHOT_API_PORT:
+        return
+    try:
+        server = get_snapshot_server()
+    except OSError:
+        return
+    snapshot_api.publish_snapshot_entry(
+        server, build_snapshot_payload(sites, snapshot), snapshot["created_at"]
+    )
+
+
 # ============================================================
 # 상태 판별 & UI 헬퍼 함수
 # ============================================================
 
-def classify_site_status(temp: float | None, warnings: list[str]) -> str:
-    """현재 기온과 특보 목록을 기반으로 현장 상태 문자열 반환"""
-    if temp is not None:
-        if temp <= TEMP_STOP_ALL:
-            return "⛔ 전면작업중지"
-        if temp <= TEMP_STOP_OUT:
-            return "🛑 옥외작업중지"
-    if warnings:
-        return "⚠️ 기상특보"
-    return "정상"
-
-
-def get_map_icon(warnings: list[str], temp: float | None) -> tuple[str, str]:
-    """Folium 마커에 사용할 (색상, 아이콘명) 반환"""
-    if temp is not None:
-        if temp <= TEMP_STOP_ALL:
-            return "purple", "ban-circle"
-        if temp <= TEMP_STOP_OUT:
-            return "red", "minus-sign"
-
-    if not warnings:
-        return "blue", "info-sign"
-
-    is_severe = any("경보" in w for w in warnings)
-    color = "darkred" if is_severe else "orange"
-    icon = "exclamation"
-    for keyword, icon_name in ICON_MAP.items():
-        if any(keyword in w for w in warnings):
-            icon = icon_name
-            break
-    return color, icon
+def compute_wind_chill(temps: np.ndarray, winds: np.ndarray) -> np.ndarray:
+    """
+    기상청 겨울철 체감온도 배열 산출.
+    13.12 + 0.6215T - 11.37V^0.16 + 0.3965V^0.16T (T: 기온 ℃, V: 풍속 km/h)
+    기온 10℃ 초과·풍속 1.3m/s 미만·풍속 결측이면 기온을 그대로 사용.
+    """
+    v016  = np.power(np.nan_to_num(winds).clip(min=0) * 3.6, 0.16)
+    chill = 13.12 + 0.6215 * temps - 11.37 * v016 + 0.3965 * v016 * temps
+    apply = (temps <= WIND_CHILL_MAX_TEMP) & (winds >= WIND_CHILL_MIN_WIND)
+    return np.where(apply, chill, temps).astype(np.float32)
 
 
 def get_status_badge_class(status: str) -> str:
@@ -494,214 +1294,375 @@ def render_metric_card(label: str, value: str, color: str = "#333", icon: str =
     """, unsafe_allow_html=True)
 
 
-# ============================================================
-# 포스터 생성 함수
-# ============================================================
+def render_partial_results(box, sites: pd.DataFrame, table: pd.DataFrame,
+                           done: int, total: int) -> None:
+    """
+    분석 중간 결과를 box(st.empty)에 표시.
+    요약 카드·간이 지도(st.map)·작업중지 현장 목록(심각한 순)만 그려 매 배치마다 가볍게 교체.
+    """
+    codes   = table["status_label"].cat.codes.to_numpy()
+    has_obs = table["temp_val"].notna().to_numpy()
+    summary = count_statuses(codes)
+    frame   = pd.DataFrame({
+        "현장명": sites["현장명"].to_numpy(),
+        "lat":    sites["lat"].to_numpy(),
+        "lon":    sites["lon"].to_numpy(),
+        "code":   codes,
+        "기온":   table["temp_val"].to_numpy(),
+    })[has_obs]
+
+    with box.container():
+        st.caption(
+            f"🌡️ 실시간 기온 분석 중... (격자 {done}/{total}) · "
+            f"관측 수신 {int(has_obs.sum())}/{len(sites)}개 현장"
+        )
+        m1, m2, m3, m4 = st.columns(4)
+        with m1: render_metric_card("관측 수신 현장", str(int(has_obs.sum())),   color="#333",    icon="🏗️")
+        with m2: render_metric_card("전면작업중지",   str(summary["전면작업중지"]), color="#512da8", icon="⛔")
+        with m3: render_metric_card("옥외작업중지",   str(summary["옥외작업중지"]), color="#d32f2f", icon="🛑")
+        with m4: render_metric_card("기상 특보",      str(summary["기상특보"]),     color="#ff9800", icon="⚠️")
+
+        col_stop, col_map = st.columns([4, 6])
+        with col_stop:
+            stops = frame[frame["code"] >= STATUS_STOP_OUT].sort_values(
+                ["code", "기온"], ascending=[False, True]
+            )
+            st.markdown(f"##### 🛑 작업중지 현장 ({len(stops)})")
+            st.dataframe(
+                stops.assign(상태=[STATUS_LABELS[c] for c in stops["code"]])[["현장명", "상태", "기온"]],
+                hide_index=True, use_container_width=True,
+                column_config={"기온": st.column_config.NumberColumn(format="%.1f℃")},
+            )
+        with col_map:
+            points = frame.dropna(subset=["lat", "lon"])
+            st.map(
+                points.assign(color=[STATUS_COLORS[c] for c in points["code"]]),
+                latitude="lat", longitude="lon", color="color", size=3000,
+            )
 
-@st.cache_resource
-def load_custom_font(size: int = 20):
-    """커스텀 폰트 로드 (Pretendard → NanumGothic → 기본 폰트 순으로 시도)"""
-    try:
-        for fname in ["Pretendard-Bold.ttf", "Pretendard-Medium.ttf", "Pretendard-Regular.ttf"]:
-            path = get_file_path(fname)
-            if os.path.exists(path):
-                return ImageFont.truetype(path, size)
-
-        # 나눔고딕 폴백
-        nanum_path = "NanumGothic-Bold.ttf"
-        if not os.path.exists(nanum_path):
-            try:
-                font_url = "https://github.com/google/fonts/raw/main/ofl/nanumgothic/NanumGothic-Bold.ttf"
-                r = requests.get(font_url, timeout=3)
-                with open(nanum_path, "wb") as f:
-                    f.write(r.content)
-            except Exception:
-                pass
-        if os.path.exists(nanum_path):
-            return ImageFont.truetype(nanum_path, size)
-    except Exception:
-        pass
-    return ImageFont.load_default()
+
+@st.cache_data(max_entries=RENDER_RESULTS_MAX)
+def build_map_markers(snapshot_id: int, scope: tuple[str, str] | None,
+                      _df_sites: pd.DataFrame) -> list[tuple]:
+    """스냅샷·조회 범위별 지도 마커 (위도, 경도, 툴팁, 색상, 아이콘명) 목록. 1회만 계산"""
+    markers = []
+    for _, row in _df_sites.dropna(subset=["lat", "lon"]).iterrows():
+        controls = [c["name"] for c in decode_controls(row["ctrl_mask"])]
+        tooltip = (
+            f"{row['현장명']}: {format_temp(row['temp_val'])}℃"
+            f" (체감 {format_value(row['feels_val'], '℃')}, 풍속 {format_value(row['wind_val'], 'm/s')}"
+            f"{', ' + PTY_LABELS[row['pty_code']] if row['pty_code'] in PTY_LABELS else ''})"
+            f" / {row['status_label']}"
+        )
+        if controls:
+            tooltip += f" / {', '.join(controls)}"
+        markers.append((row["lat"], row["lon"], tooltip, row["marker_color"], row["marker_icon"]))
+    return markers
 
 
-def create_warning_poster(df: pd.DataFrame, warning_summary: dict, temp_stop_summary: dict) -> bytes:
+def summarize_sites(df_sites: pd.DataFrame) -> tuple[dict, dict, dict]:
+    """
+    포스터용 요약 산출.
+    ({특보명: [현장명, ...]}, {'stop_all': [...], 'stop_out': [...]},
+     {'stop_all': [기준 온도, ...], 'stop_out': [...]}) 튜플 반환.
+    기준 온도는 규칙 엔진이 현장별로 적용한 값(th_all/th_out)의 고유값
     """
-    A4(300dpi) 크기의 현황 포스터 이미지 생성 후 JPEG 바이트 반환.
+    warning_summary: dict[str, list[str]] = {}
+    for name, mask in df_sites.loc[df_sites["warn_mask"] != 0, ["현장명", "warn_mask"]].itertuples(index=False):
+        for w in decode_warnings(mask):
+            warning_summary.setdefault(w, []).append(name)
+
+    temp_stop_summary = {
+        "stop_all": df_sites[df_sites["status_label"] == STATUS_LABELS[STATUS_STOP_ALL]]["현장명"].tolist(),
+        "stop_out": df_sites[df_sites["status_label"] == STATUS_LABELS[STATUS_STOP_OUT]]["현장명"].tolist(),
+    }
+    thresholds = {
+        "stop_all": sorted(df_sites["th_all"].dropna().astype(float).unique().tolist()),
+        "stop_out": sorted(df_sites["th_out"].dropna().astype(float).unique().tolist()),
+    }
+    return warning_summary, temp_stop_summary, thresholds
 
-    Parameters
-    ----------
-    df               : 전체 현장 DataFrame
-    warning_summary  : {특보명: [현장명, ...]} 딕셔너리
-    temp_stop_summary: {'stop_all': [...], 'stop_out': [...]} 딕셔너리
-    """
-    W, H = 2480, 3508
-    img  = Image.new("RGB", (W, H), color="#FFFFFF")
-    draw = ImageDraw.Draw(img)
-
-    # 폰트
-    font = {
-        "title":      load_custom_font(130),
-        "subtitle":   load_custom_font(55),
-        "section":    load_custom_font(75),
-        "box_title":  load_custom_font(65),
-        "content":    load_custom_font(50),
-        "safety_ttl": load_custom_font(70),
-        "safety_cnt": load_custom_font(50),
-        "footer":     load_custom_font(40),
+
+def build_group_summaries(df_sites: pd.DataFrame, group_col: str) -> dict[str, tuple[dict, dict, dict]]:
+    """그룹 컬럼(지역/사업부) 값별 포스터 요약 딕셔너리"""
+    return {
+        str(name): summarize_sites(group)
+        for name, group in df_sites.groupby(group_col, sort=True)
     }
 
-    MARGIN_X      = 100
-    CONTENT_W     = W - MARGIN_X * 2
-    BOX_PAD       = 60
-    BOX_RADIUS    = 40
-    LINE_SPACING  = 70
-    HEADER_H      = 450
-
-    # ── 헤더 ──────────────────────────────────────────────
-    draw.rectangle([(0, 0), (W, HEADER_H)], fill="#005bac")
-
-    title_text = "GS건설 현장 기상 및 작업통제 현황"
-    bbox = draw.textbbox((0, 0), title_text, font=font["title"])
-    draw.text(((W - (bbox[2] - bbox[0])) / 2, 140), title_text, font=font["title"], fill="white")
-
-    time_text = get_kst_now().strftime("%Y년 %m월 %d일 %H:%M 기준")
-    bbox = draw.textbbox((0, 0), time_text, font=font["subtitle"])
-    draw.text(((W - (bbox[2] - bbox[0])) / 2, 320), time_text, font=font["subtitle"], fill="#dddddd")
-
-    # ── 경고 박스 렌더 헬퍼 ───────────────────────────────
-    def draw_warning_box(title: str, title_color: str, bg_color: str,
-                         border_color: str, sites: list[str], start_y: int) -> int:
-        if not sites:
-            return start_y
-
-        sites_str = ", ".join(sites)
-        max_w     = CONTENT_W - BOX_PAD * 2
-        lines, curr_line = [], ""
-
-        for word in sites_str.split(" "):
-            test = curr_line + word + " "
-            if draw.textbbox((0, 0), test, font=font["content"])[2] > max_w:
-                lines.append(curr_line)
-                curr_line = word + " "
-            else:
-                curr_line = test
-        if curr_line:
-            lines.append(curr_line)
-
-        box_h = BOX_PAD * 2 + 80 + len(lines) * LINE_SPACING + 20
-        draw.rounded_rectangle(
-            [(MARGIN_X, start_y), (W - MARGIN_X, start_y + box_h)],
-            radius=BOX_RADIUS, fill=bg_color, outline=border_color, width=5,
+
+def render_download(job: Future, label: str, filename: str, mime: str) -> None:
+    """완료된 렌더링 작업 결과로 다운로드 버튼 표시"""
+    try:
+        st.download_button(
+            label, data=job.result(),
+            file_name=filename, mime=mime, use_container_width=True,
         )
+    except Exception as e:
+        st.error(f"포스터 생성 오류: {e}")
 
-        tx, ty = MARGIN_X + BOX_PAD, start_y + BOX_PAD
-        draw.text((tx, ty), title, font=font["box_title"], fill=title_color)
-        ty += 100
-        for line in lines:
-            draw.text((tx, ty), line, font=font["content"], fill="#333333")
-            ty += LINE_SPACING
-
-        return start_y + box_h + 60
-
-    # ── 본문 특보/작업중지 내용 ────────────────────────────
-    current_y = HEADER_H + 100
-    draw.text((MARGIN_X, current_y), "■ 혹한기 작업 중지 및 기상 특보 현황",
-              font=font["section"], fill="#333333")
-    current_y += 120
-
-    is_empty = True
-
-    # 전면 작업중지 (-15℃ 이하)
-    sites_stop_all = temp_stop_summary.get("stop_all", [])
-    if sites_stop_all:
-        label = f"⛔ 전면 작업중지 (영하 15℃ 이하, {len(sites_stop_all)}개소)"
-        current_y = draw_warning_box(label, "#ffffff", "#311b92", "#512da8", sites_stop_all, current_y)
-        is_empty  = False
-
-    # 옥외 작업중지 (-12℃ 이하)
-    sites_stop_out = temp_stop_summary.get("stop_out", [])
-    if sites_stop_out:
-        label = f"🛑 옥외 작업중지 (영하 12℃ 이하, {len(sites_stop_out)}개소)"
-        current_y = draw_warning_box(label, "#b71c1c", "#ffebee", "#ef9a9a", sites_stop_out, current_y)
-        is_empty  = False
-
-    # 폭염 / 기타 특보
-    sites_heat, sites_others = [], []
-    for w_name, sites in warning_summary.items():
-        if "건조" in w_name:
+
+def show_render_job(key: tuple, fn, args: tuple, label: str,
+                    filename: str, mime: str, message: str) -> None:
+    """렌더링 작업 제출 후 완료됐으면 다운로드 버튼, 아니면 자리표시 표시"""
+    job = submit_render(key, fn, *args)
+    if job is not None and job.done():
+        render_download(job, label, filename, mime)
+    else:
+        wait_render_job(key, fn, args, message)
+
+
+@st.fragment(run_every=RENDER_POLL_SEC)
+def wait_render_job(key: tuple, fn, args: tuple, message: str) -> None:
+    """렌더링 완료 전까지 자리표시 문구를 보여주고, 완료되면 화면 전체를 한 번 갱신"""
+    job = submit_render(key, fn, *args)
+    if job is not None and job.done():
+        st.rerun()
+    st.caption(message if job is not None else "⏳ 렌더링 대기열이 가득 차 순서를 기다리는 중입니다...")
+
+
+def collect_render_batch(jobs: dict[str, tuple[tuple, tuple]], fn) -> int:
+    """
+    그룹별 렌더링 작업을 풀에 제출하고 완료된 결과를 session_state.poster_parts에 모음.
+    대기열이 차면 남은 그룹은 다음 확인 때 제출. 모인 결과 수 반환.
+    완료 결과는 풀에서 RENDER_RESULTS_MAX개만 보관되므로 끝나는 대로 옮겨 둔다.
+    """
+    parts = st.session_state.poster_parts
+    for name, (key, args) in jobs.items():
+        if name in parts:
             continue
-        if "폭염" in w_name:
-            sites_heat.extend(sites)
-        else:
-            sites_others.append((w_name, sites))
-
-    if sites_heat:
-        label = f"🔥 폭염 특보 ({len(sites_heat)}개소)"
-        current_y = draw_warning_box(label, "#d32f2f", "#ffebee", "#ffcdd2",
-                                     list(set(sites_heat)), current_y)
-        is_empty = False
-
-    for w_name, s_list in sites_others:
-        color, bg, bd = "#1565c0", "#e3f2fd", "#90caf9"
-        if "한파" in w_name: color, bg, bd = "#0277bd", "#e1f5fe", "#b3e5fc"
-        elif "대설" in w_name: color, bg, bd = "#546e7a", "#eceff1", "#cfd8dc"
-        current_y = draw_warning_box(f"⚠️ {w_name} ({len(s_list)}개소)",
-                                     color, bg, bd, s_list, current_y)
-        is_empty = False
-
-    # 이슈 없음 박스
-    if is_empty:
-        draw.rounded_rectangle(
-            [(MARGIN_X, current_y), (W - MARGIN_X, current_y + 300)],
-            radius=BOX_RADIUS, fill="#f1f8e9", outline="#c8e6c9", width=5,
+        job = submit_render(key, fn, *args)
+        if job is not None and job.done() and job.exception() is None:
+            parts[name] = job.result()
+    return len(parts)
+
+
+def show_render_batch(jobs: dict[str, tuple[tuple, tuple]], fn, group_label: str, fmt: str,
+                      label: str, filename: str, message: str) -> None:
+    """그룹별 렌더링이 모두 끝나면 ZIP 다운로드 버튼, 아니면 진행 상황 표시"""
+    if st.session_state.poster_zip is None and collect_render_batch(jobs, fn) == len(jobs):
+        st.session_state.poster_zip = poster.pack_poster_batch(
+            st.session_state.poster_parts, group_label, fmt
         )
-        draw.text((MARGIN_X + 60, current_y + 110),
-                  "현재 작업 통제 기준 도달 및 기상 특보가 없습니다.",
-                  font=font["box_title"], fill="#33691e")
-        current_y += 300
-
-    # ── 안전 수칙 박스 ────────────────────────────────────
-    BOTTOM_START = H - 1400
-    if current_y < BOTTOM_START:
-        current_y = BOTTOM_START
-
-    def draw_safety_box(title: str, content: str,
-                        t_col: str, bg_col: str, bd_col: str, start_y: int) -> int:
-        box_h = 600
-        draw.rounded_rectangle(
-            [(MARGIN_X, start_y), (W - MARGIN_X, start_y + box_h)],
-            radius=BOX_RADIUS, fill=bg_col, outline=bd_col, width=5,
+    if st.session_state.poster_zip is not None:
+        st.download_button(
+            label, data=st.session_state.poster_zip,
+            file_name=filename, mime="application/zip", use_container_width=True,
         )
-        tx, ty = MARGIN_X + BOX_PAD, start_y + BOX_PAD
-        draw.text((tx, ty), title, font=font["safety_ttl"], fill=t_col)
-        ty += 110
-        draw.multiline_text((tx + 20, ty), content.strip(),
-                            font=font["safety_cnt"], fill="#333333", spacing=35)
-        return start_y + box_h + 60
-
-    safety_content = (
-        "[GS건설 혹한기 작업 중지 기준]\n"
-        "• 영하 12℃ 이하: 옥외 작업 중지 (Warm-up, 휴식시간 준수)\n"
-        "• 영하 15℃ 이하: 옥내/옥외 전면 작업 중지\n"
-        "[한랭질환 예방 수칙]\n"
-        "• 따뜻한 옷(3겹 이상), 따뜻한 물, 따뜻한 장소(휴게시설) 마련\n"
-        "• 추운 시간대(새벽, 아침) 작업 축소 및 유연한 근무시간 운영"
-    )
-    current_y = draw_safety_box(
-        "※ 혹한기 현장 안전수칙 및 작업 중지 기준 안내",
-        safety_content, "#1a237e", "#e8eaf6", "#9fa8da", current_y,
+    else:
+        wait_render_batch(jobs, fn, message)
+
+
+@st.fragment(run_every=RENDER_POLL_SEC)
+def wait_render_batch(jobs: dict[str, tuple[tuple, tuple]], fn, message: str) -> None:
+    """그룹별 렌더링 완료 전까지 진행 수를 보여주고, 모두 완료되면 화면 전체를 한 번 갱신"""
+    done = collect_render_batch(jobs, fn)
+    if done == len(jobs):
+        st.rerun()
+    st.caption(f"{message} ({done}/{len(jobs)})")
+
+
+# ============================================================
+# 렌더링 작업 풀 (포스터 등 CPU 집약 작업)
+# ============================================================
+
+@st.cache_resource
+def get_render_pool() -> dict:
+    """
+    렌더링 전용 프로세스 풀 (전체 세션 공유).
+    {'executor': ProcessPoolExecutor, 'jobs': {작업 키: Future}, 'lock': Lock}
+    """
+    # 서버 스레드가 잡고 있던 잠금을 물려받지 않도록 fork 대신 forkserver 방식 사용.
+    # 작업 함수는 poster 모듈 최상위 함수만 사용 (작업자에서 import 후 실행)
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(["poster"])
+    return {
+        "executor": ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=ctx),
+        "jobs": {},
+        "lock": threading.Lock(),
+    }
+
+
+def submit_render(key: tuple, fn, *args) -> Future | None:
+    """
+    렌더링 작업을 프로세스 풀에 제출하고 Future 반환.
+    같은 key(스냅샷 기준)의 작업은 한 번만 실행되어 결과를 공유하며,
+    실패한 작업만 다시 제출. 대기 작업이 RENDER_QUEUE_MAX개 이상이면 None 반환.
+    """
+    pool = get_render_pool()
+    with pool["lock"]:
+        jobs = pool["jobs"]
+        job  = jobs.get(key)
+        if job is not None and not (job.done() and job.exception() is not None):
+            return job
+
+        if sum(not j.done() for j in jobs.values()) >= RENDER_QUEUE_MAX:
+            return None
+
+        try:
+            job = pool["executor"].submit(fn, *args)
+        except BrokenProcessPool:
+            get_render_pool.clear()
+            return None
+        jobs.pop(key, None)
+        jobs[key] = job
+
+        # 완료된 오래된 결과부터 정리
+        for old_key in [k for k, j in jobs.items() if j.done()][:-RENDER_RESULTS_MAX]:
+            del jobs[old_key]
+    return job
+
+
+# ============================================================
+# 현장 상세 & 지도 (프래그먼트)
+# ============================================================
+
+def render_site_detail(target: pd.Series) -> None:
+    """선택 현장 상세 카드 (상태·기온·관측 요소·작업 통제·특보)"""
+    ws         = decode_warnings(target["warn_mask"])
+    controls   = decode_controls(target["ctrl_mask"])
+    curr_temp  = target["temp_val"]
+    t_time     = format_obs_ts(target["obs_ts"])
+    status_txt = target["status_label"]
+    badge_cls  = get_status_badge_class(status_txt)
+
+    with st.container(border=True):
+        st.markdown(f"""
+        <div class="site-header">
+            <span class="site-title">📍 {target['현장명']}</span>
+            <span class="status-badge {badge_cls}">{status_txt}</span>
+        </div>
+        <div class="site-addr">{target['주소']}</div>
+        """, unsafe_allow_html=True)
+
+        geo_level = target.get(GEO_LEVEL_COLUMN)
+        if pd.isna(target["lat"]):
+            st.caption("⚠️ 주소를 좌표로 변환하지 못해 지도에 표시되지 않습니다.")
+        elif pd.notna(geo_level) and geo_level < GAZETTEER_MIN_LEVEL:
+            st.caption(
+                f"⚠️ 지도 위치는 {gazetteer.LEVEL_LABELS[int(geo_level)]} 좌표(대략)입니다. "
+                "주소 확인 후 '데이터/위치 재분석'을 실행하세요."
+            )
+
+        if pd.notna(curr_temp):
+            st.markdown(f"""
+            <div><span class="temp-badge">🌡️ {format_temp(curr_temp)}℃</span></div>
+            <div class="time-caption">기상청 {t_time} 실시간 관측 기준</div>
+            """, unsafe_allow_html=True)
+
+            o1, o2, o3, o4 = st.columns(4)
+            o1.metric("체감온도", format_value(target["feels_val"], "℃"))
+            o2.metric("풍속",     format_value(target["wind_val"], "m/s"))
+            o3.metric("습도",     format_value(target["humid_val"], "%", digits=0))
+            # 강수형태는 범주값이므로 증감 화살표(delta) 대신 라벨과 도움말로 표시
+            pty_label = PTY_LABELS.get(int(target["pty_code"]))
+            o4.metric(f"강수(1h) · {pty_label}" if pty_label else "강수(1h)",
+                      format_value(target["rain_val"], "mm"),
+                      help=f"강수형태: {pty_label or '없음'}")
+
+            # 작업중지 사유: 기준 온도 이하 / 특보 규칙 / 해제 대기(히스테리시스).
+            # 특보는 규칙상 상태가 현재 상태 이상인 경우에만 사유로 표시
+            status_code = STATUS_LABELS.index(status_txt)
+            if status_code >= STATUS_STOP_OUT:
+                is_all      = status_code == STATUS_STOP_ALL
+                threshold   = target["th_all"] if is_all else target["th_out"]
+                warn_levels = compile_work_rules(get_work_rules(), target.to_frame().T)["warn_levels"]
+                warn_mask   = int(target["warn_mask"])
+                stop_ws     = [
+                    w_name for bit, w_name in enumerate(WARNING_TYPES)
+                    if warn_mask >> bit & 1 and warn_levels[bit] >= status_code
+                ]
+                if curr_temp <= threshold:
+                    cause = f"현재 기온이 작업중지 기준({format_temp(threshold)}℃) 이하입니다."
+                elif stop_ws:
+                    cause = f"발효 중인 특보({', '.join(stop_ws)})에 따른 작업중지 대상입니다."
+                else:
+                    hysteresis = get_work_rules()["hysteresis"]
+                    cause = (
+                        f"기온이 기준({format_temp(threshold)}℃)을 넘었지만 {hysteresis['band']}℃ 넘게 오르고 "
+                        f"{format_obs_ts(target['status_since'])}부터 {hysteresis['min_hold_min']}분 이상 "
+                        "지나야 해제됩니다."
+                    )
+                if is_all:
+                    st.error(f"⛔ [긴급] {cause} 옥내/옥외 모든 작업을 중지하십시오.")
+                else:
+                    st.error(f"🛑 [경고] {cause} 옥외 작업을 중지하고 보온 조치하십시오.")
+
+            for control in controls:
+                st.warning(f"🚧 [{control['name']}] {control['message']}")
+        else:
+            st.caption("기온 데이터 수신 실패")
+
+        if ws:
+            st.markdown("---")
+            st.caption("발효 중인 기상청 특보:")
+            for w in ws:
+                color_md = ":red" if "경보" in w else ":orange"
+                st.markdown(f"{color_md}[**⚠️ {w}**]")
+
+
+def on_map_click() -> None:
+    """지도 마커 클릭 콜백 → 툴팁의 현장명으로 선택 현장 변경"""
+    clicked = (st.session_state.get("site_map") or {}).get("last_object_clicked_tooltip")
+    if clicked:
+        st.session_state.selected_site = clicked.split(":")[0].strip()
+
+
+@st.fragment
+def render_site_explorer(map_box, df_view: pd.DataFrame, df_final: pd.DataFrame,
+                         snapshot_id: int, scope: tuple[str, str] | None) -> None:
+    """
+    현장 선택 목록·상세 카드·지도를 하나의 프래그먼트로 렌더링.
+    선택/클릭 시 이 프래그먼트만 다시 실행되며, 지도는 스냅샷·조회 범위가 같으면
+    다시 마운트하지 않고 중심·배율만 이동 (지도는 map_box 컨테이너에 표시).
+    """
+    site_list = df_view["현장명"].tolist()
+    curr_idx  = site_list.index(st.session_state.selected_site) \
+                if st.session_state.selected_site in site_list else None
+
+    selected_option = st.selectbox(
+        "현장 선택", site_list, index=curr_idx,
+        placeholder="현장명을 입력하세요", label_visibility="collapsed",
     )
+    if selected_option is not None:
+        st.session_state.selected_site = selected_option
+
+    target = None
+    if st.session_state.selected_site:
+        matched = df_final[df_final["현장명"] == st.session_state.selected_site]
+        target  = matched.iloc[0] if not matched.empty else None
+
+    if target is not None:
+        render_site_detail(target)
+    else:
+        st.info("지도 마커를 클릭하거나 목록에서 현장을 선택하세요.")
+
+    with map_box:
+        markers = build_map_markers(snapshot_id, scope, df_view)
+        if not markers:
+            return
+
+        # 지도 본문은 기본 중심으로 고정하고 선택 현장은 center/zoom으로만 이동
+        m = folium.Map(location=[MAP_DEFAULT_LAT, MAP_DEFAULT_LON],
+                       zoom_start=MAP_DEFAULT_ZOOM, tiles="cartodbpositron")
+        for lat, lon, tooltip, color, icon_name in markers:
+            folium.Marker(
+                [lat, lon],
+                tooltip=tooltip,
+                icon=folium.Icon(color=color, icon=icon_name, prefix="fa"),
+            ).add_to(m)
 
-    # ── 푸터 ──────────────────────────────────────────────
-    draw.line([(50, H - 150), (W - 50, H - 150)], fill="#cccccc", width=5)
-    footer = "GS E&C 안전보건팀"
-    bbox   = draw.textbbox((0, 0), footer, font=font["footer"])
-    draw.text(((W - (bbox[2] - bbox[0])) / 2, H - 100), footer,
-              font=font["footer"], fill="#888888")
+        if target is not None and pd.notna(target["lat"]):
+            center, zoom = (target["lat"], target["lon"]), 10
+        else:
+            center, zoom = (MAP_DEFAULT_LAT, MAP_DEFAULT_LON), MAP_DEFAULT_ZOOM
 
-    buf = io.BytesIO()
-    img.save(buf, format="JPEG", quality=95)
-    return buf.getvalue()
+        st_folium(
+            m, key="site_map", width=None, height=600,
+            center=center, zoom=zoom,
+            returned_objects=["last_object_clicked_tooltip"],
+            on_change=on_map_click,
+        )
 
 
 # ============================================================
@@ -712,19 +1673,31 @@ with st.sidebar:
 
     # 텔레그램 전송
     st.markdown("### 📤 알림 전송")
+    diff_only = st.checkbox("변동 현장만 전송", value=True,
+                            help="직전 알림 이후 작업중지 진입·해제된 현장만 전송합니다.")
     if st.button("🚀 텔레그램 전송", use_container_width=True):
-        if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
+        if not TELEGRAM_TOKEN or not get_alert_routes(None):
             st.error("텔레그램 토큰 또는 Chat ID가 설정되지 않았습니다.")
         elif st.session_state.processed_data is None:
             st.warning("먼저 데이터를 업데이트하여 분석을 완료해주세요.")
         else:
-            msg = build_telegram_message(st.session_state.processed_data)
-            with st.spinner("텔레그램 전송 중..."):
-                success, log = send_telegram_alert(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, msg)
-                if success:
-                    st.success("✅ 전송 완료!")
-                else:
-                    st.error(f"❌ 전송 실패: {log}")
+            results = dispatch_alerts(
+                expand_snapshot(st.session_state.weather_data, st.session_state.processed_data),
+                st.session_state.processed_data, get_session_scope(), diff_only=diff_only,
+            )
+            st.success("📨 " + " / ".join(results))
+
+    # 최근 전송 결과 (발송은 백그라운드에서 진행)
+    if TELEGRAM_TOKEN:
+        dispatcher = get_alert_dispatcher()
+        pending    = alert_dispatch.pending_count(dispatcher)
+        if pending:
+            st.caption(f"⏳ 전송 대기 {pending}건")
+        for entry in list(dispatcher["log"])[-3:][::-1]:
+            sent_at = datetime.datetime.fromtimestamp(entry["time"], KST).strftime("%H:%M:%S")
+            parts   = f" ({entry['parts']}개로 분할)" if entry["parts"] > 1 else ""
+            icon    = "✅" if entry["ok"] else "❌"
+            st.caption(f"{icon} {sent_at} {entry['label']}{parts} · {entry['detail']}")
 
     st.divider()
 
@@ -737,6 +1710,7 @@ with st.sidebar:
         st.session_state.processed_data = None
         st.session_state.analysis_done  = False
         st.cache_data.clear()
+        get_grid_cell_store.clear()
         st.rerun()
 
 
@@ -755,6 +1729,12 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+# ── 규칙 설정 오류 안내 (기본 규칙으로 대체된 경우) ─────────
+rule_errors = load_work_rules()[1]
+if rule_errors:
+    st.warning("⚠️ secrets [work_rules] 설정 오류로 기본 작업 통제 규칙을 적용합니다.\n\n"
+               + "\n".join(f"- {e}" for e in rule_errors))
+
 # ── 실시간 업데이트 버튼 ───────────────────────────────────
 col_btn, _ = st.columns([2, 8])
 with col_btn:
@@ -774,181 +1754,200 @@ if df.empty:
 
 # ── 실시간 기상 분석 (processed_data 없을 때만 실행) ──────
 if st.session_state.processed_data is None:
-    full_text = get_weather_warning_text()
-    temp_df   = df.copy()
-
-    # 분석 컬럼 초기화
-    temp_df["warnings"]    = None
-    temp_df["temp_val"]    = None
-    temp_df["temp_time"]   = None
-    temp_df["status_label"] = "정상"
+    bulletin = get_weather_warning_bulletin()
 
-    total_sites = len(temp_df)
     progress_bar = st.progress(0)
-    status_text  = st.empty()
+    stream_box   = st.empty()
 
-    for i, row in temp_df.iterrows():
-        status_text.caption(f"🌡️ 실시간 기온 분석 중... ({i + 1}/{total_sites}) - {row['현장명']}")
-        progress_bar.progress((i + 1) / total_sites)
-
-        # 기상 특보 매칭
-        addr     = str(row.get("주소", ""))
-        keywords = [
+    # 기상 특보 매칭 (전문 변경 구역에 해당하는 현장만 재매칭)
+    site_keywords = {}
+    for _, row in df.iterrows():
+        addr = str(row.get("주소", ""))
+        site_keywords[row["현장명"]] = [
             t[:-1] for t in addr.replace(",", " ").split()
             if t.endswith(("시", "군")) and len(t[:-1]) >= 2
         ]
-        w_list = analyze_warnings(full_text, keywords) if keywords else []
-        temp_df.at[i, "warnings"] = w_list
+    site_warnings = assign_site_warnings(bulletin, site_keywords)
+
+    # 현장별 격자 산정
+    n_sites    = len(df)
+    obs        = np.full((n_sites, len(NOWCAST_CATEGORIES)), np.nan, dtype=np.float32)
+    obs_ts     = np.zeros(n_sites, dtype=np.uint32)
+    warn_masks = np.zeros(n_sites, dtype=np.uint32)
+
+    previous = get_latest_snapshot()   # 작업중지 해제 히스테리시스 기준
+    prev_codes, _ = get_previous_status(previous, df)
+
+    site_cells: dict[int, tuple[int, int]] = {}
+    cell_flags: dict[tuple[int, int], int] = {}
+    cell_prev:  dict[tuple[int, int], int] = {}
+    for pos, (_, row) in enumerate(df.iterrows()):
+        warn_masks[pos] = encode_warnings(site_warnings.get(row["현장명"], []))
 
-        # 실시간 기온 조회
-        current_temp, temp_time = None, None
         if pd.notna(row["lat"]):
-            current_temp, temp_time = get_current_temp(row["lat"], row["lon"])
-        temp_df.at[i, "temp_val"]  = current_temp
-        temp_df.at[i, "temp_time"] = temp_time
+            cell = dfs_xy_conv(row["lat"], row["lon"])
+            site_cells[pos]  = cell
+            cell_flags[cell] = cell_flags.get(cell, 0) | int(warn_masks[pos])
+            cell_prev[cell]  = max(cell_prev.get(cell, -1), int(prev_codes[pos]))
+
+    def _fill_observations(cell_states: dict) -> None:
+        for pos, cell in site_cells.items():
+            state = cell_states.get(cell)
+            if state is None:
+                continue
+            for category, value in state.get("obs", {"T1H": state["temp"]}).items():
+                obs[pos, NOWCAST_INDEX[category]] = value
+            obs_ts[pos] = int(state["base"].timestamp())
+
+    # 우선순위 기반 격자 갱신 (기준 온도 근접 격자만 매 발표마다 조회)
+    def _on_progress(done: int, total: int) -> None:
+        progress_bar.progress(done / total)
+
+    # 배치마다 수신된 결과를 중간 표시 (전체 완료 전에도 작업중지 현장 확인 가능)
+    def _on_batch(done: int, total: int, cell_states: dict) -> None:
+        _fill_observations(cell_states)
+        render_partial_results(
+            stream_box, df, build_snapshot_table(obs, obs_ts, warn_masks, df, previous), done, total
+        )
 
-        # 상태 판별
-        temp_df.at[i, "status_label"] = classify_site_status(current_temp, w_list)
+    cell_states = refresh_grid_cells(
+        cell_flags, on_progress=_on_progress, on_batch=_on_batch, prev_status=cell_prev
+    )
+    _fill_observations(cell_states)
 
-    status_text.empty()
+    stream_box.empty()
     progress_bar.empty()
 
-    st.session_state.processed_data = temp_df
+    st.session_state.processed_data = publish_snapshot(
+        build_snapshot_table(obs, obs_ts, warn_masks, df, previous), df
+    )
     st.session_state.analysis_done  = True
+    publish_snapshot_api(df, st.session_state.processed_data)
 
-# ── 분석 결과 집계 ────────────────────────────────────────
-df_final      = st.session_state.processed_data
-stop_all_list = df_final[df_final["status_label"] == "⛔ 전면작업중지"]["현장명"].tolist()
-stop_out_list = df_final[df_final["status_label"] == "🛑 옥외작업중지"]["현장명"].tolist()
-warn_only_list= df_final[df_final["status_label"] == "⚠️ 기상특보"]["현장명"].tolist()
+    # 변동분 자동 알림 (변동이 없으면 전송하지 않음)
+    if TELEGRAM_AUTO_ALERT and TELEGRAM_TOKEN:
+        dispatch_alerts(expand_snapshot(df, st.session_state.processed_data),
+                        st.session_state.processed_data, None, diff_only=True)
 
-# 특보 요약 딕셔너리 재구성 (포스터용)
-warning_summary_final: dict[str, list[str]] = {}
-for _, row in df_final.iterrows():
-    for w in (row["warnings"] or []):
-        warning_summary_final.setdefault(w, []).append(row["현장명"])
+# ── 분석 결과 집계 ────────────────────────────────────────
+snapshot = st.session_state.processed_data
+df_final = expand_snapshot(df, snapshot)
+
+# 특보/작업중지 요약 (전국 포스터용)
+warning_summary_final, temp_stop_summary_final, thresholds_final = summarize_sites(df_final)
+
+# ── 조회 범위 (지역/사업부 드릴다운) ─────────────────────
+col_scope, col_value, _ = st.columns([2, 3, 5])
+with col_scope:
+    scope_cols = ["전체"] + [c for c in ROLLUP_COLUMNS if c in snapshot["rollups"]]
+    scope_col  = st.selectbox("조회 범위", scope_cols, key="scope_col", label_visibility="collapsed")
+with col_value:
+    if scope_col in snapshot["rollups"]:
+        st.selectbox(
+            f"{scope_col} 선택", snapshot["rollups"][scope_col]["view"].index.tolist(),
+            key="scope_value", label_visibility="collapsed",
+        )
 
-temp_stop_summary_final = {"stop_all": stop_all_list, "stop_out": stop_out_list}
+scope         = get_session_scope()
+df_view       = select_scope(df_final, snapshot, scope)
+scope_summary = get_scope_summary(snapshot, scope)
 
 # ── 요약 메트릭 카드 ─────────────────────────────────────
 m1, m2, m3, m4 = st.columns(4)
-with m1: render_metric_card("전체 현장",    str(len(df_final)),       color="#333",    icon="🏗️")
-with m2: render_metric_card("전면작업중지", str(len(stop_all_list)),  color="#512da8", icon="⛔")
-with m3: render_metric_card("옥외작업중지", str(len(stop_out_list)),  color="#d32f2f", icon="🛑")
-with m4: render_metric_card("기상 특보",   str(len(warn_only_list)), color="#ff9800", icon="⚠️")
+with m1: render_metric_card(format_scope(scope), str(scope_summary["현장 수"]),      color="#333",    icon="🏗️")
+with m2: render_metric_card("전면작업중지",      str(scope_summary["전면작업중지"]), color="#512da8", icon="⛔")
+with m3: render_metric_card("옥외작업중지",      str(scope_summary["옥외작업중지"]), color="#d32f2f", icon="🛑")
+with m4: render_metric_card("기상 특보",         str(scope_summary["기상특보"]),     color="#ff9800", icon="⚠️")
+
+bulletin_info = get_bulletin_info()
+if bulletin_info.get("changed_at"):
+    st.caption(
+        f"📢 기상특보 최종 변경: {bulletin_info['changed_at'].strftime('%m월 %d일 %H:%M')} 발표"
+        f" (발표번호 {bulletin_info['tm_seq']})"
+    )
+
+# ── 지역/사업부별 집계표 ─────────────────────────────────
+rollup_col = scope[0] if scope else next(iter(snapshot["rollups"]), None)
+if rollup_col:
+    with st.expander(f"📊 {rollup_col}별 현황", expanded=scope is not None):
+        view = snapshot["rollups"][rollup_col]["view"]
+        st.dataframe(
+            view.drop(columns="warn_mask").assign(
+                발효특보=[", ".join(decode_warnings(m)) for m in view["warn_mask"]]
+            ),
+            use_container_width=True,
+            column_config={
+                "최저기온": st.column_config.NumberColumn(format="%.1f℃"),
+                "평균기온": st.column_config.NumberColumn(format="%.1f℃"),
+            },
+        )
 
 st.divider()
 
 # ── 좌(현장 상세) / 우(지도) 레이아웃 ────────────────────
 col_left, col_right = st.columns([4, 6])
 
-with col_left:
-    st.markdown("##### 🔍 현장 상세 확인")
-    site_list = df_final["현장명"].tolist()
-    curr_idx  = site_list.index(st.session_state.selected_site) \
-                if st.session_state.selected_site in site_list else None
-
-    selected_option = st.selectbox(
-        "현장 선택", site_list, index=curr_idx,
-        placeholder="현장명을 입력하세요", label_visibility="collapsed",
-    )
-    if selected_option != st.session_state.selected_site:
-        st.session_state.selected_site = selected_option
-        st.rerun()
-
-    if st.session_state.selected_site:
-        target = df_final[df_final["현장명"] == st.session_state.selected_site].iloc[0]
-        ws         = target["warnings"]
-        curr_temp  = target["temp_val"]
-        t_time     = target["temp_time"]
-        status_txt = target["status_label"]
-        badge_cls  = get_status_badge_class(status_txt)
-
-        with st.container(border=True):
-            st.markdown(f"""
-            <div class="site-header">
-                <span class="site-title">📍 {target['현장명']}</span>
-                <span class="status-badge {badge_cls}">{status_txt}</span>
-            </div>
-            <div class="site-addr">{target['주소']}</div>
-            """, unsafe_allow_html=True)
-
-            if curr_temp is not None:
-                st.markdown(f"""
-                <div><span class="temp-badge">🌡️ {curr_temp}℃</span></div>
-                <div class="time-caption">기상청 {t_time} 실시간 관측 기준</div>
-                """, unsafe_allow_html=True)
-
-                if curr_temp <= TEMP_STOP_ALL:
-                    st.error("⛔ [긴급] 현재 영하 15도 이하입니다. 옥내/옥외 모든 작업을 중지하십시오.")
-                elif curr_temp <= TEMP_STOP_OUT:
-                    st.error("🛑 [경고] 현재 영하 12도 이하입니다. 옥외 작업을 중지하고 보온 조치하십시오.")
-            else:
-                st.caption("기온 데이터 수신 실패")
-
-            if ws:
-                st.markdown("---")
-                st.caption("발효 중인 기상청 특보:")
-                for w in ws:
-                    color_md = ":red" if "경보" in w else ":orange"
-                    st.markdown(f"{color_md}[**⚠️ {w}**]")
-    else:
-        st.info("지도 마커를 클릭하거나 목록에서 현장을 선택하세요.")
-
-    st.write("")
-
-    # 포스터 다운로드
-    st.markdown("##### 📋 현황 포스터 다운로드")
-    with st.container(height=120, border=True):
-        try:
-            poster_bytes = create_warning_poster(
-                df_final, warning_summary_final, temp_stop_summary_final
-            )
-            filename = f"현장기상_작업통제현황_{get_kst_now().strftime('%Y%m%d_%H%M')}.jpg"
-            st.download_button(
-                "🖼️ 현황 포스터(A4) 다운로드", data=poster_bytes,
-                file_name=filename, mime="image/jpeg", use_container_width=True,
-            )
-        except Exception as e:
-            st.error(f"포스터 생성 오류: {e}")
-
-
 with col_right:
-    valid_coords = df_final.dropna(subset=["lat", "lon"])
     st.markdown(
         "<div class='map-disclaimer'>"
-        "⚠️ 색상 구분: 보라색(-15℃↓), 빨간색(-12℃↓), 주황/적색(특보), 파란색(정상)"
+        "⚠️ 색상 구분: 보라색(전면작업중지), 빨간색(옥외작업중지), 검은색(강풍/강수 통제), 주황/적색(특보), 파란색(정상)"
         "</div>",
         unsafe_allow_html=True,
     )
+    map_box = st.container()
 
-    if not valid_coords.empty:
-        # 선택된 현장 중심 or 기본값
-        if st.session_state.selected_site:
-            sel = df_final[df_final["현장명"] == st.session_state.selected_site]
-            if not sel.empty:
-                c_lat, c_lon, zoom = sel.iloc[0]["lat"], sel.iloc[0]["lon"], 10
-            else:
-                c_lat, c_lon, zoom = MAP_DEFAULT_LAT, MAP_DEFAULT_LON, MAP_DEFAULT_ZOOM
-        else:
-            c_lat, c_lon, zoom = MAP_DEFAULT_LAT, MAP_DEFAULT_LON, MAP_DEFAULT_ZOOM
-
-        m = folium.Map(location=[c_lat, c_lon], zoom_start=zoom, tiles="cartodbpositron")
+with col_left:
+    st.markdown("##### 🔍 현장 상세 확인")
+    # 현장 선택·지도 클릭은 이 프래그먼트만 다시 실행 (집계·포스터는 유지)
+    render_site_explorer(map_box, df_view, df_final, snapshot["id"], scope)
 
-        for _, row in valid_coords.iterrows():
-            color, icon_name = get_map_icon(row["warnings"], row["temp_val"])
-            popup_msg = f"{row['현장명']}: {row['temp_val']}℃ / {row['status_label']}"
-            folium.Marker(
-                [row["lat"], row["lon"]],
-                tooltip=popup_msg,
-                icon=folium.Icon(color=color, icon=icon_name, prefix="fa"),
-            ).add_to(m)
+    st.write("")
 
-        map_data = st_folium(m, width=None, height=600)
+    # 포스터 다운로드
+    st.markdown("##### 📋 현황 포스터 다운로드")
+    with st.container(border=True):
+        # 렌더링은 프로세스 풀에서 수행, 완료 전에는 자리표시만 표시
+        poster_fmt = st.radio(
+            "포스터 형식", list(POSTER_FORMAT_LABELS), format_func=POSTER_FORMAT_LABELS.get,
+            horizontal=True, label_visibility="collapsed",
+        )
+        ext, mime = poster.POSTER_FORMATS[poster_fmt]
+        stamp     = snapshot["created_at"].strftime("%Y%m%d_%H%M")
+
+        show_render_job(
+            ("poster", snapshot["id"], poster_fmt), poster.create_warning_poster,
+            (warning_summary_final, temp_stop_summary_final, snapshot["created_at"], None, poster_fmt,
+             thresholds_final),
+            label="🖼️ 현황 포스터(A4) 다운로드", filename=f"현장기상_작업통제현황_{stamp}.{ext}",
+            mime=mime, message="🖼️ 포스터를 생성하는 중입니다...",
+        )
 
-        # 지도 마커 클릭 → 현장 선택
-        if map_data and map_data.get("last_object_clicked_tooltip"):
-            clicked_name = map_data["last_object_clicked_tooltip"].split(":")[0].strip()
-            if clicked_name != st.session_state.selected_site:
-                st.session_state.selected_site = clicked_name
-                st.rerun()
+        # 지역/사업부별 일괄 생성 (ZIP)
+        group_cols = [c for c in POSTER_GROUP_COLUMNS if c in df_final.columns]
+        if group_cols:
+            col_grp, col_run = st.columns([5, 5])
+            with col_grp:
+                group_col = st.selectbox("일괄 생성 기준", group_cols, label_visibility="collapsed")
+            with col_run:
+                if st.button("🗂️ 일괄 생성", use_container_width=True):
+                    st.session_state.poster_batch = (snapshot["id"], group_col, poster_fmt)
+                    st.session_state.poster_parts = {}
+                    st.session_state.poster_zip   = None
+
+            # 그룹마다 작업을 따로 제출해 RENDER_WORKERS개 프로세스에서 병렬 생성, ZIP은 여기서 묶음
+            if st.session_state.poster_batch == (snapshot["id"], group_col, poster_fmt):
+                batch_jobs = {
+                    name: (
+                        ("poster", snapshot["id"], f"{group_col} {name}", poster_fmt),
+                        (w_summary, s_summary, snapshot["created_at"], f"{group_col} {name}", poster_fmt,
+                         thresholds),
+                    )
+                    for name, (w_summary, s_summary, thresholds)
+                    in build_group_summaries(df_final, group_col).items()
+                }
+                show_render_batch(
+                    batch_jobs, poster.create_warning_poster, group_col, poster_fmt,
+                    label=f"📦 {group_col}별 포스터(ZIP) 다운로드",
+                    filename=f"현장기상_작업통제현황_{group_col}별_{stamp}.zip",
+                    message=f"📦 {group_col}별 포스터를 생성하는 중입니다...",
+                )
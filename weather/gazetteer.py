@@ -0,0 +1,305 @@
+"""
+GS건설 현장 주소 오프라인 지명 사전 (Gazetteer)
+==============================================
+시/도 · 시/군/구 · 읍/면/동 대표 좌표를 담은 CSV(gazetteer_kr.csv)를
+색인해 주소를 네트워크 없이 좌표로 변환하는 모듈.
+
+사전 파일 재생성:
+    python gazetteer.py <원본 파일> [출력 CSV]
+
+원본 파일은 다음 중 하나.
+- 법정동 중심점 CSV (dnid, dnname, dnlatitude, dnlongitude, dnradius).
+  동봉된 gazetteer_kr.csv는 PyPI dongnae-kr 2025.11.30 배포본(dongnaeKR_251130.csv)으로 생성
+- 기상청 단기예보 격자 위경도 엑셀 (1단계/2단계/3단계, 위도·경도(초/100))
+
+시도·시군구 좌표는 하위 읍면동 중심점을 면적(반경²) 가중 평균한 값이다.
+"""
+
+# ============================================================
+# 라이브러리 임포트
+# ============================================================
+import os
+import re
+import sys
+import csv
+from collections import defaultdict
+
+
+# ============================================================
+# 상수 및 설정값
+# ============================================================
+GAZETTEER_FILENAME = "gazetteer_kr.csv"
+GAZETTEER_COLUMNS  = ["시도", "시군구", "읍면동", "lat", "lon"]
+
+# 해석 수준 (LEVEL_EXACT: 지오코더가 전체 주소로 찾은 좌표)
+LEVEL_NONE, LEVEL_SIDO, LEVEL_SIGUNGU, LEVEL_EMD, LEVEL_EXACT = 0, 1, 2, 3, 4
+LEVEL_LABELS = {
+    LEVEL_NONE:    "좌표 없음",
+    LEVEL_SIDO:    "시/도 중심",
+    LEVEL_SIGUNGU: "시/군/구 중심",
+    LEVEL_EMD:     "읍/면/동 중심",
+    LEVEL_EXACT:   "주소 위치",
+}
+
+# 시/도 표기 → 약칭 ('광주시'는 경기도 광주시와 겹치므로 제외)
+SIDO_ALIASES = {
+    "서울": ["서울특별시", "서울시", "서울"],
+    "부산": ["부산광역시", "부산시", "부산"],
+    "대구": ["대구광역시", "대구시", "대구"],
+    "인천": ["인천광역시", "인천시", "인천"],
+    "광주": ["광주광역시", "광주"],
+    "대전": ["대전광역시", "대전시", "대전"],
+    "울산": ["울산광역시", "울산시", "울산"],
+    "세종": ["세종특별자치시", "세종시", "세종"],
+    "경기": ["경기도", "경기"],
+    "강원": ["강원특별자치도", "강원도", "강원"],
+    "충북": ["충청북도", "충북"],
+    "충남": ["충청남도", "충남"],
+    "전북": ["전북특별자치도", "전라북도", "전북"],
+    "전남": ["전라남도", "전남"],
+    "경북": ["경상북도", "경북"],
+    "경남": ["경상남도", "경남"],
+    "제주": ["제주특별자치도", "제주도", "제주"],
+}
+SIDO_LOOKUP = {alias: short for short, aliases in SIDO_ALIASES.items() for alias in aliases}
+
+
+# ============================================================
+# 주소 분해
+# ============================================================
+
+def get_file_path(filename: str) -> str:
+    """현재 모듈 디렉토리 기준 절대 경로 반환"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
+def normalize_sido(token: str) -> str | None:
+    """시/도 표기를 약칭(예: '경기도' → '경기')으로 변환. 시/도가 아니면 None"""
+    return SIDO_LOOKUP.get(token)
+
+
+def split_sigungu(name: str) -> str:
+    """'용인시수지구' 처럼 붙여 쓴 시+구를 '용인시 수지구'로 분리"""
+    match = re.fullmatch(r"(\S+?시)\s*(\S+구)", name)
+    return f"{match.group(1)} {match.group(2)}" if match else name
+
+
+def split_address(address: str) -> tuple[str | None, str, str]:
+    """
+    주소를 (시도 약칭, 시군구, 읍면동)으로 분해.
+    괄호 안 내용은 제거하며, 해당 단계가 없으면 빈 문자열(시도는 None).
+    """
+    tokens = re.sub(r"\([^)]*\)", "", str(address)).replace(",", " ").split()
+
+    # 시/도 위치 탐색 ('수직구#2: 경기도 ...' 같은 접두어, '광주 광역시' 띄어쓰기 허용)
+    sido, rest = None, tokens
+    for i, token in enumerate(tokens):
+        joined = token + tokens[i + 1] if i + 1 < len(tokens) else ""
+        if normalize_sido(joined):
+            sido, rest = normalize_sido(joined), tokens[i + 2:]
+            break
+        if normalize_sido(token):
+            sido, rest = normalize_sido(token), tokens[i + 1:]
+            break
+
+    i, sigungu_parts = 0, []
+    while i < len(rest) and len(sigungu_parts) < 2 and rest[i].endswith(("시", "군", "구")):
+        sigungu_parts.append(rest[i])
+        i += 1
+
+    emd = ""
+    if i < len(rest) and rest[i].endswith(("읍", "면", "동", "가")) and not rest[i][0].isdigit():
+        emd = rest[i]
+    return sido, " ".join(sigungu_parts), emd
+
+
+def base_emd_name(emd: str) -> str:
+    """행정동 번호 제거 (예: '풍덕천1동' → '풍덕천동', '종로1·2·3·4가동' → '종로가동')"""
+    return re.sub(r"제?[\d·.]+(?=[동가])", "", emd)
+
+
+# ============================================================
+# 사전 색인 & 주소 해석
+# ============================================================
+
+def load_gazetteer(path: str | None = None) -> dict:
+    """
+    지명 사전 CSV를 읽어 색인 생성.
+    {'entries': {(시도, 시군구, 읍면동): (위도, 경도)}, 'sido_of': {시군구: {시도, ...}}}
+    시군구·읍면동 키는 공백을 제거해 비교하며, '시 구' 형태는 '시' 단독 키도 함께 등록.
+    """
+    path = path or get_file_path(GAZETTEER_FILENAME)
+    sums: dict[tuple, list[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    exact: dict[tuple, tuple[float, float]] = {}
+
+    def _add(key: tuple, lat: float, lon: float) -> None:
+        acc = sums[key]
+        acc[0] += lat
+        acc[1] += lon
+        acc[2] += 1
+
+    if not os.path.exists(path):
+        return {"entries": {}, "sido_of": {}}
+
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            sido, lat, lon = row["시도"], float(row["lat"]), float(row["lon"])
+            sigungu = row["시군구"].replace(" ", "")
+            emd     = row["읍면동"]
+            exact[(sido, sigungu, emd)] = (lat, lon)
+
+            # 별칭: 시 단독('용인시수지구' → '용인시'), 행정동 번호 제거
+            parts = row["시군구"].split()
+            if len(parts) == 2:
+                _add((sido, parts[0], emd), lat, lon)
+            if emd and base_emd_name(emd) != emd:
+                _add((sido, sigungu, base_emd_name(emd)), lat, lon)
+                if len(parts) == 2:
+                    _add((sido, parts[0], base_emd_name(emd)), lat, lon)
+
+    entries = {key: (acc[0] / acc[2], acc[1] / acc[2]) for key, acc in sums.items()}
+    entries.update(exact)
+
+    sido_of: dict[str, set[str]] = defaultdict(set)
+    for sido, sigungu, _ in entries:
+        if sigungu:
+            sido_of[sigungu].add(sido)
+    return {"entries": entries, "sido_of": dict(sido_of)}
+
+
+def resolve_address(index: dict, address: str) -> tuple[float, float, int] | None:
+    """
+    주소 → (위도, 경도, 해석 수준). 읍면동 → 시군구 → 시도 순으로 가장 상세한 단계를 반환.
+    시도가 생략된 주소는 시군구 이름이 한 시도에만 있을 때만 해석. 실패 시 None.
+    """
+    entries = index["entries"]
+    sido, sigungu, emd = split_address(address)
+    sigungu_keys = [sigungu.replace(" ", "")]
+    if " " in sigungu:
+        sigungu_keys.append(sigungu.split()[0])
+
+    if sido:
+        sido_candidates = [sido]
+    else:
+        found = index["sido_of"].get(sigungu_keys[0], set())
+        sido_candidates = list(found) if len(found) == 1 else []
+
+    emd_keys = [emd, base_emd_name(emd)] if emd else []
+
+    for s in sido_candidates:
+        # 세종시 등 시군구가 없는 시도는 ('', 읍면동)으로 등록됨
+        for sgg in [*sigungu_keys, ""]:
+            for e in emd_keys:
+                if (s, sgg, e) in entries:
+                    return (*entries[(s, sgg, e)], LEVEL_EMD)
+        for sgg in sigungu_keys:
+            if sgg and (s, sgg, "") in entries:
+                return (*entries[(s, sgg, "")], LEVEL_SIGUNGU)
+        if (s, "", "") in entries:
+            return (*entries[(s, "", "")], LEVEL_SIDO)
+    return None
+
+
+# ============================================================
+# 사전 파일 생성
+# ============================================================
+
+def read_kma_grid_table(path: str) -> list[dict]:
+    """기상청 격자 위경도 엑셀(1단계/2단계/3단계, 위도·경도(초/100)) → 사전 행 목록"""
+    import pandas as pd
+
+    df   = pd.read_excel(path) if path.endswith((".xlsx", ".xls")) else pd.read_csv(path)
+    rows = []
+    for _, r in df.iterrows():
+        sido = normalize_sido(str(r["1단계"]).strip())
+        if sido is None:
+            continue
+        sigungu = "" if pd.isna(r["2단계"]) else split_sigungu(str(r["2단계"]).strip())
+        emd     = "" if pd.isna(r["3단계"]) else str(r["3단계"]).strip()
+        rows.append({
+            "시도": sido, "시군구": sigungu, "읍면동": emd,
+            "lat": float(r["위도(초/100)"]), "lon": float(r["경도(초/100)"]),
+        })
+    return rows
+
+
+def read_bjd_centroids(path: str) -> list[dict]:
+    """
+    법정동 중심점 CSV(dnid, dnname, dnlatitude, dnlongitude, dnradius) → 사전 행 목록.
+    읍면동 행은 그대로 쓰고(읍면 행이 없으면 하위 리의 가중 평균), 시군구·시도 행은
+    하위 읍면동 중심점을 면적(반경²) 가중 평균해 만든다.
+    개편 전후 이름이 함께 있으면('전라북도'/'전북특별자치도') 최신 코드만 사용.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        records = sorted(csv.DictReader(f), key=lambda r: r["dnid"], reverse=True)
+
+    emd_rows: dict[tuple, tuple[float, float, float]] = {}
+    ri_sums: dict[tuple, list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+    seen = set()
+    for r in records:
+        sido, sigungu, emd = split_address(r["dnname"])
+        if sido is None or not emd:
+            continue
+        if sido == "세종":
+            sigungu = ""   # 세종시는 시군구 없이 읍면동으로 바로 구분
+        is_ri   = not r["dnname"].endswith(emd)
+        key     = (sido, sigungu, emd, r["dnname"].split()[-1] if is_ri else "")
+        if key in seen:
+            continue
+        seen.add(key)
+
+        lat, lon = float(r["dnlatitude"]), float(r["dnlongitude"])
+        weight   = float(r["dnradius"]) ** 2 or 1e-6
+        if is_ri:
+            acc = ri_sums[key[:3]]
+            acc[0] += lat * weight
+            acc[1] += lon * weight
+            acc[2] += weight
+        else:
+            emd_rows[key[:3]] = (lat, lon, weight)
+
+    for key, acc in ri_sums.items():
+        if key not in emd_rows:
+            emd_rows[key] = (acc[0] / acc[2], acc[1] / acc[2], acc[2])
+
+    sums: dict[tuple, list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+    for (sido, sigungu, _), (lat, lon, weight) in emd_rows.items():
+        parents = [(sido, "", "")]
+        if sigungu:
+            parents.append((sido, sigungu, ""))
+        for key in parents:
+            acc = sums[key]
+            acc[0] += lat * weight
+            acc[1] += lon * weight
+            acc[2] += weight
+
+    rows = [{"시도": s, "시군구": sgg, "읍면동": emd, "lat": lat, "lon": lon}
+            for (s, sgg, emd), (lat, lon, _) in emd_rows.items()]
+    rows += [{"시도": s, "시군구": sgg, "읍면동": emd, "lat": acc[0] / acc[2], "lon": acc[1] / acc[2]}
+             for (s, sgg, emd), acc in sums.items()]
+    return rows
+
+
+def write_gazetteer(rows: list[dict], path: str) -> None:
+    """사전 행 목록을 정렬해 CSV로 저장 (좌표는 소수점 5자리, 약 1m)"""
+    rows = sorted(rows, key=lambda r: (r["시도"], r["시군구"], r["읍면동"]))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=GAZETTEER_COLUMNS)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({**r, "lat": f"{r['lat']:.5f}", "lon": f"{r['lon']:.5f}"})
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python gazetteer.py <원본 파일> [출력 CSV]")
+
+    source = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) > 2 else get_file_path(GAZETTEER_FILENAME)
+
+    import pandas as pd
+    columns = pd.read_excel(source, nrows=0) if source.endswith((".xlsx", ".xls")) else pd.read_csv(source, nrows=0)
+    reader  = read_kma_grid_table if "1단계" in columns.columns else read_bjd_centroids
+    rows    = reader(source)
+    write_gazetteer(rows, output)
+    print(f"{len(rows)}개 지명 → {output}")
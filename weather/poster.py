@@ -0,0 +1,444 @@
+"""
+GS건설 현장 기상/작업통제 현황 포스터 생성
+==========================================
+Streamlit 의존성 없이 포스터를 그리는 모듈.
+app.py의 렌더링 프로세스 풀 작업자에서 실행된다.
+
+포스터 배치는 그리기 명령 목록으로 한 번만 계산하고,
+래스터(JPEG) / 벡터(SVG) 출력부가 같은 명령 목록을 각각 그린다.
+"""
+
+# ============================================================
+# 라이브러리 임포트
+# ============================================================
+import os
+import io
+import re
+import base64
+import zipfile
+import datetime
+import functools
+from html import escape
+
+import requests
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:  # 폰트 서브셋 미지원 시 SVG는 폰트 이름만 참조
+    font_subset = None
+
+
+# ============================================================
+# 상수 및 설정값
+# ============================================================
+POSTER_W, POSTER_H = 2480, 3508   # A4 300dpi
+
+FONT_SIZES = {
+    "title":      130,
+    "subtitle":   55,
+    "section":    75,
+    "box_title":  65,
+    "content":    50,
+    "safety_ttl": 70,
+    "safety_cnt": 50,
+    "footer":     40,
+}
+
+# 작업중지 기준 온도(℃)를 따로 넘기지 않았을 때 표기할 기본 기준
+DEFAULT_THRESHOLDS = {"stop_all": [-15.0], "stop_out": [-12.0]}
+
+POSTER_FORMATS = {
+    "jpeg": ("jpg", "image/jpeg"),
+    "svg":  ("svg", "image/svg+xml"),
+}
+
+
+# ============================================================
+# 유틸리티 함수
+# ============================================================
+
+def get_file_path(filename: str) -> str:
+    """현재 모듈 디렉토리 기준 절대 경로 반환"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
+@functools.lru_cache(maxsize=None)
+def find_font_path() -> str | None:
+    """커스텀 폰트 경로 탐색 (Pretendard → NanumGothic 순). 없으면 None"""
+    for fname in ["Pretendard-Bold.ttf", "Pretendard-Medium.ttf", "Pretendard-Regular.ttf"]:
+        path = get_file_path(fname)
+        if os.path.exists(path):
+            return path
+
+    # 나눔고딕 폴백
+    nanum_path = "NanumGothic-Bold.ttf"
+    if not os.path.exists(nanum_path):
+        try:
+            font_url = "https://github.com/google/fonts/raw/main/ofl/nanumgothic/NanumGothic-Bold.ttf"
+            r = requests.get(font_url, timeout=3)
+            with open(nanum_path, "wb") as f:
+                f.write(r.content)
+        except Exception:
+            pass
+    return nanum_path if os.path.exists(nanum_path) else None
+
+
+@functools.lru_cache(maxsize=None)
+def load_custom_font(size: int = 20):
+    """커스텀 폰트 로드. 폰트 파일이 없으면 기본 폰트 반환"""
+    try:
+        path = find_font_path()
+        if path:
+            return ImageFont.truetype(path, size)
+    except Exception:
+        pass
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=1)
+def get_measure_draw() -> ImageDraw.ImageDraw:
+    """텍스트 폭 측정 전용 ImageDraw (1x1 이미지)"""
+    return ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+# ============================================================
+# 포스터 배치 (그리기 명령 목록 생성)
+# ============================================================
+
+def format_thresholds(values: list[float]) -> str:
+    """기준 온도 목록 → 표기 문자열 (예: [-15] → '영하 15℃', [-13, -15] → '영하 13℃ / 영하 15℃')"""
+    labels = [
+        f"영하 {abs(v):g}℃" if v < 0 else f"{v:g}℃"
+        for v in sorted(set(values), reverse=True)
+    ]
+    return " / ".join(labels)
+
+
+def layout_warning_poster(warning_summary: dict, temp_stop_summary: dict,
+                          generated_at: datetime.datetime, scope: str | None = None,
+                          thresholds: dict | None = None) -> list[tuple]:
+    """
+    포스터 그리기 명령 목록 생성.
+    thresholds는 포스터 대상 현장에 적용된 기준 온도 {'stop_all': [...], 'stop_out': [...]}
+    (사업부/지역별 기준이 섞이면 여러 값). None이면 DEFAULT_THRESHOLDS.
+
+    명령 형식
+    ---------
+    ('rect',         (x0, y0, x1, y1), fill)
+    ('rounded_rect', (x0, y0, x1, y1), radius, fill, outline, width)
+    ('line',         (x0, y0, x1, y1), fill, width)
+    ('text',         (x, y), 문자열, 폰트키, fill)
+    ('multiline',    (x, y), 문자열, 폰트키, fill, spacing)
+    """
+    W, H    = POSTER_W, POSTER_H
+    th      = {**DEFAULT_THRESHOLDS, **{k: v for k, v in (thresholds or {}).items() if len(v)}}
+    th_all  = format_thresholds(th["stop_all"])
+    th_out  = format_thresholds(th["stop_out"])
+    measure = get_measure_draw()
+    font    = {key: load_custom_font(size) for key, size in FONT_SIZES.items()}
+    ops: list[tuple] = []
+
+    MARGIN_X      = 100
+    CONTENT_W     = W - MARGIN_X * 2
+    BOX_PAD       = 60
+    BOX_RADIUS    = 40
+    LINE_SPACING  = 70
+    HEADER_H      = 450
+
+    def text_width(text: str, key: str) -> float:
+        bbox = measure.textbbox((0, 0), text, font=font[key])
+        return bbox[2] - bbox[0]
+
+    # ── 헤더 ──────────────────────────────────────────────
+    ops.append(("rect", (0, 0, W, HEADER_H), "#005bac"))
+
+    title_text = "GS건설 현장 기상 및 작업통제 현황"
+    ops.append(("text", ((W - text_width(title_text, "title")) / 2, 140), title_text, "title", "white"))
+
+    time_text = generated_at.strftime("%Y년 %m월 %d일 %H:%M 기준")
+    if scope:
+        time_text = f"{scope} · {time_text}"
+    ops.append(("text", ((W - text_width(time_text, "subtitle")) / 2, 320), time_text, "subtitle", "#dddddd"))
+
+    # ── 경고 박스 배치 헬퍼 ───────────────────────────────
+    def add_warning_box(title: str, title_color: str, bg_color: str,
+                        border_color: str, sites: list[str], start_y: int) -> int:
+        if not sites:
+            return start_y
+
+        sites_str = ", ".join(sites)
+        max_w     = CONTENT_W - BOX_PAD * 2
+        lines, curr_line = [], ""
+
+        for word in sites_str.split(" "):
+            test = curr_line + word + " "
+            if measure.textbbox((0, 0), test, font=font["content"])[2] > max_w:
+                lines.append(curr_line)
+                curr_line = word + " "
+            else:
+                curr_line = test
+        if curr_line:
+            lines.append(curr_line)
+
+        box_h = BOX_PAD * 2 + 80 + len(lines) * LINE_SPACING + 20
+        ops.append(("rounded_rect", (MARGIN_X, start_y, W - MARGIN_X, start_y + box_h),
+                    BOX_RADIUS, bg_color, border_color, 5))
+
+        tx, ty = MARGIN_X + BOX_PAD, start_y + BOX_PAD
+        ops.append(("text", (tx, ty), title, "box_title", title_color))
+        ty += 100
+        for line in lines:
+            ops.append(("text", (tx, ty), line, "content", "#333333"))
+            ty += LINE_SPACING
+
+        return start_y + box_h + 60
+
+    # ── 본문 특보/작업중지 내용 ────────────────────────────
+    current_y = HEADER_H + 100
+    ops.append(("text", (MARGIN_X, current_y), "■ 혹한기 작업 중지 및 기상 특보 현황", "section", "#333333"))
+    current_y += 120
+
+    is_empty = True
+
+    # 전면 작업중지 (기준 온도 이하)
+    sites_stop_all = temp_stop_summary.get("stop_all", [])
+    if sites_stop_all:
+        label = f"⛔ 전면 작업중지 ({th_all} 이하, {len(sites_stop_all)}개소)"
+        current_y = add_warning_box(label, "#ffffff", "#311b92", "#512da8", sites_stop_all, current_y)
+        is_empty  = False
+
+    # 옥외 작업중지 (기준 온도 이하)
+    sites_stop_out = temp_stop_summary.get("stop_out", [])
+    if sites_stop_out:
+        label = f"🛑 옥외 작업중지 ({th_out} 이하, {len(sites_stop_out)}개소)"
+        current_y = add_warning_box(label, "#b71c1c", "#ffebee", "#ef9a9a", sites_stop_out, current_y)
+        is_empty  = False
+
+    # 폭염 / 기타 특보
+    sites_heat, sites_others = [], []
+    for w_name, sites in warning_summary.items():
+        if "건조" in w_name:
+            continue
+        if "폭염" in w_name:
+            sites_heat.extend(sites)
+        else:
+            sites_others.append((w_name, sites))
+
+    if sites_heat:
+        label = f"🔥 폭염 특보 ({len(sites_heat)}개소)"
+        current_y = add_warning_box(label, "#d32f2f", "#ffebee", "#ffcdd2",
+                                    list(set(sites_heat)), current_y)
+        is_empty = False
+
+    for w_name, s_list in sites_others:
+        color, bg, bd = "#1565c0", "#e3f2fd", "#90caf9"
+        if "한파" in w_name: color, bg, bd = "#0277bd", "#e1f5fe", "#b3e5fc"
+        elif "대설" in w_name: color, bg, bd = "#546e7a", "#eceff1", "#cfd8dc"
+        current_y = add_warning_box(f"⚠️ {w_name} ({len(s_list)}개소)",
+                                    color, bg, bd, s_list, current_y)
+        is_empty = False
+
+    # 이슈 없음 박스
+    if is_empty:
+        ops.append(("rounded_rect", (MARGIN_X, current_y, W - MARGIN_X, current_y + 300),
+                    BOX_RADIUS, "#f1f8e9", "#c8e6c9", 5))
+        ops.append(("text", (MARGIN_X + 60, current_y + 110),
+                    "현재 작업 통제 기준 도달 및 기상 특보가 없습니다.", "box_title", "#33691e"))
+        current_y += 300
+
+    # ── 안전 수칙 박스 ────────────────────────────────────
+    BOTTOM_START = H - 1400
+    if current_y < BOTTOM_START:
+        current_y = BOTTOM_START
+
+    def add_safety_box(title: str, content: str,
+                       t_col: str, bg_col: str, bd_col: str, start_y: int) -> int:
+        box_h = 600
+        ops.append(("rounded_rect", (MARGIN_X, start_y, W - MARGIN_X, start_y + box_h),
+                    BOX_RADIUS, bg_col, bd_col, 5))
+        tx, ty = MARGIN_X + BOX_PAD, start_y + BOX_PAD
+        ops.append(("text", (tx, ty), title, "safety_ttl", t_col))
+        ty += 110
+        ops.append(("multiline", (tx + 20, ty), content.strip(), "safety_cnt", "#333333", 35))
+        return start_y + box_h + 60
+
+    by_group = " (사업부/지역별 기준)" if len(set(th["stop_all"])) > 1 or len(set(th["stop_out"])) > 1 else ""
+    safety_content = (
+        f"[GS건설 혹한기 작업 중지 기준{by_group}]\n"
+        f"• {th_out} 이하: 옥외 작업 중지 (Warm-up, 휴식시간 준수)\n"
+        f"• {th_all} 이하: 옥내/옥외 전면 작업 중지\n"
+        "[한랭질환 예방 수칙]\n"
+        "• 따뜻한 옷(3겹 이상), 따뜻한 물, 따뜻한 장소(휴게시설) 마련\n"
+        "• 추운 시간대(새벽, 아침) 작업 축소 및 유연한 근무시간 운영"
+    )
+    current_y = add_safety_box(
+        "※ 혹한기 현장 안전수칙 및 작업 중지 기준 안내",
+        safety_content, "#1a237e", "#e8eaf6", "#9fa8da", current_y,
+    )
+
+    # ── 푸터 ──────────────────────────────────────────────
+    ops.append(("line", (50, H - 150, W - 50, H - 150), "#cccccc", 5))
+    footer = "GS E&C 안전보건팀"
+    ops.append(("text", ((W - text_width(footer, "footer")) / 2, H - 100), footer, "footer", "#888888"))
+
+    return ops
+
+
+# ============================================================
+# 출력부 (JPEG / SVG)
+# ============================================================
+
+def render_poster_jpeg(ops: list[tuple]) -> bytes:
+    """그리기 명령 목록을 A4(300dpi) JPEG 바이트로 래스터화"""
+    img  = Image.new("RGB", (POSTER_W, POSTER_H), color="#FFFFFF")
+    draw = ImageDraw.Draw(img)
+
+    for op in ops:
+        kind = op[0]
+        if kind == "rect":
+            _, (x0, y0, x1, y1), fill = op
+            draw.rectangle([(x0, y0), (x1, y1)], fill=fill)
+        elif kind == "rounded_rect":
+            _, (x0, y0, x1, y1), radius, fill, outline, width = op
+            draw.rounded_rectangle([(x0, y0), (x1, y1)], radius=radius,
+                                   fill=fill, outline=outline, width=width)
+        elif kind == "line":
+            _, (x0, y0, x1, y1), fill, width = op
+            draw.line([(x0, y0), (x1, y1)], fill=fill, width=width)
+        elif kind == "text":
+            _, xy, text, key, fill = op
+            draw.text(xy, text, font=load_custom_font(FONT_SIZES[key]), fill=fill)
+        elif kind == "multiline":
+            _, xy, text, key, fill, spacing = op
+            draw.multiline_text(xy, text, font=load_custom_font(FONT_SIZES[key]),
+                                fill=fill, spacing=spacing)
+
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=95)
+    return buf.getvalue()
+
+
+def build_svg_font_face(text: str) -> str:
+    """포스터에 쓰인 글자만 남긴 서브셋 폰트(WOFF)를 @font-face 규칙으로 반환"""
+    path = find_font_path()
+    if font_subset is None or path is None:
+        return ""
+
+    options = font_subset.Options()
+    options.flavor = "woff"
+    options.hinting = False              # 벡터 출력이므로 힌팅 불필요
+    options.layout_features = ["kern"]   # 한글 조합형 기능 불필요, 커닝만 유지
+    font = font_subset.load_font(path, options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+
+    buf = io.BytesIO()
+    font_subset.save_font(font, buf, options)
+    data = base64.b64encode(buf.getvalue()).decode()
+    return f'@font-face{{font-family:"PosterFont";src:url(data:font/woff;base64,{data}) format("woff");}}'
+
+
+def render_poster_svg(ops: list[tuple]) -> bytes:
+    """그리기 명령 목록을 SVG 바이트로 출력 (Pretendard 서브셋 내장)"""
+    body: list[str] = []
+    used_text: list[str] = []
+
+    def svg_text(x: float, y: float, text: str, key: str, fill: str) -> str:
+        # PIL은 글자 윗선 기준, SVG는 기준선(baseline) 기준으로 배치
+        ascent = load_custom_font(FONT_SIZES[key]).getmetrics()[0]
+        return (f'<text x="{x:.1f}" y="{y + ascent:.1f}" font-size="{FONT_SIZES[key]}" '
+                f'fill="{fill}">{escape(text)}</text>')
+
+    for op in ops:
+        kind = op[0]
+        if kind == "rect":
+            _, (x0, y0, x1, y1), fill = op
+            body.append(f'<rect x="{x0}" y="{y0}" width="{x1 - x0}" height="{y1 - y0}" fill="{fill}"/>')
+        elif kind == "rounded_rect":
+            # PIL 외곽선은 박스 안쪽에 그려지므로 선 두께 절반만큼 안쪽으로 보정
+            _, (x0, y0, x1, y1), radius, fill, outline, width = op
+            half = width / 2
+            body.append(
+                f'<rect x="{x0 + half}" y="{y0 + half}" width="{x1 - x0 - width}" '
+                f'height="{y1 - y0 - width}" rx="{radius - half}" fill="{fill}" '
+                f'stroke="{outline}" stroke-width="{width}"/>'
+            )
+        elif kind == "line":
+            _, (x0, y0, x1, y1), fill, width = op
+            body.append(f'<line x1="{x0}" y1="{y0}" x2="{x1}" y2="{y1}" stroke="{fill}" stroke-width="{width}"/>')
+        elif kind == "text":
+            _, (x, y), text, key, fill = op
+            body.append(svg_text(x, y, text, key, fill))
+            used_text.append(text)
+        elif kind == "multiline":
+            _, (x, y), text, key, fill, spacing = op
+            line_h = get_measure_draw().textbbox((0, 0), "A", font=load_custom_font(FONT_SIZES[key]))[3] + spacing
+            for i, line in enumerate(text.split("\n")):
+                body.append(svg_text(x, y + i * line_h, line, key, fill))
+            used_text.append(text)
+
+    style = (
+        build_svg_font_face("".join(used_text))
+        + 'text{font-family:"PosterFont","Pretendard","Malgun Gothic",sans-serif;'
+          'font-weight:700;white-space:pre;}'
+    )
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="210mm" height="297mm" '
+        f'viewBox="0 0 {POSTER_W} {POSTER_H}">'
+        f'<style>{style}</style>'
+        f'<rect width="100%" height="100%" fill="#FFFFFF"/>'
+        + "".join(body)
+        + "</svg>"
+    )
+    return svg.encode("utf-8")
+
+
+POSTER_RENDERERS = {
+    "jpeg": render_poster_jpeg,
+    "svg":  render_poster_svg,
+}
+
+
+# ============================================================
+# 포스터 생성 함수
+# ============================================================
+
+def create_warning_poster(warning_summary: dict, temp_stop_summary: dict,
+                          generated_at: datetime.datetime, scope: str | None = None,
+                          fmt: str = "jpeg", thresholds: dict | None = None) -> bytes:
+    """
+    A4 크기의 현황 포스터 생성 후 바이트 반환.
+
+    Parameters
+    ----------
+    warning_summary  : {특보명: [현장명, ...]} 딕셔너리
+    temp_stop_summary: {'stop_all': [...], 'stop_out': [...]} 딕셔너리
+    generated_at     : 포스터에 표기할 기준 시각 (분석 스냅샷 생성 시각)
+    scope            : 부제에 표기할 범위 (예: '지역 경기'). None이면 전국
+    fmt              : 'jpeg'(300dpi 래스터) 또는 'svg'(벡터)
+    thresholds       : 적용 기준 온도 {'stop_all': [...], 'stop_out': [...]} (규칙 엔진 결과)
+    """
+    ops = layout_warning_poster(warning_summary, temp_stop_summary, generated_at, scope, thresholds)
+    return POSTER_RENDERERS[fmt](ops)
+
+
+def pack_poster_batch(posters: dict[str, bytes], group_label: str, fmt: str = "svg") -> bytes:
+    """
+    그룹(지역/사업부)별로 생성한 포스터를 ZIP으로 묶어 바이트 반환.
+    포스터 생성은 app.py 렌더링 풀에서 그룹마다 병렬로 수행하고, 묶기만 호출 측에서 한다.
+
+    Parameters
+    ----------
+    posters     : {그룹명: create_warning_poster 결과 바이트} 딕셔너리
+    group_label : 그룹 기준 컬럼명 ('지역' 또는 '사업부'), 파일명에 표기
+    fmt         : 'jpeg' 또는 'svg'
+    """
+    ext = POSTER_FORMATS[fmt][0]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, data in sorted(posters.items()):
+            safe_name = re.sub(r'[\\/:*?"<>|]', "_", str(name))
+            zf.writestr(f"{group_label}_{safe_name}.{ext}", data)
+    return buf.getvalue()
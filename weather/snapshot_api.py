@@ -0,0 +1,169 @@
+"""
+GS건설 현장 기상/작업통제 현황 스냅샷 API
+=========================================
+최신 분석 스냅샷을 JSON으로 제공하는 읽기 전용 HTTP 엔드포인트.
+표준 라이브러리만 사용하며 Streamlit 앱 옆에서 스레드로 실행된다.
+
+응답 본문·gzip 압축본·ETag는 스냅샷 게시 시 한 번만 만들고,
+요청 처리 시에는 조건부 요청(ETag/Last-Modified) 비교와 전송만 수행한다.
+"""
+
+# ============================================================
+# 라이브러리 임포트
+# ============================================================
+import gzip
+import json
+import hashlib
+import datetime
+import threading
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ============================================================
+# 상수 및 설정값
+# ============================================================
+SNAPSHOT_PATHS = ("/", "/snapshot", "/snapshot.json")
+
+
+# ============================================================
+# 스냅샷 응답 생성
+# ============================================================
+
+def build_snapshot_entry(payload: dict, modified_at: datetime.datetime) -> dict:
+    """
+    JSON 응답 캐시 항목 생성.
+    {'body': JSON 바이트, 'gzip': 압축 바이트, 'etag', 'etag_gzip', 'last_modified', 'modified_at'}
+    ETag는 payload 내용으로만 계산하므로 내용이 같으면 값도 같다.
+    gzip 응답은 바이트가 다르므로 '-gz'를 붙인 별도 ETag 사용.
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    modified_at = modified_at.astimezone(datetime.timezone.utc).replace(microsecond=0)
+    digest = hashlib.sha1(body).hexdigest()[:20]
+    return {
+        "body":          body,
+        "gzip":          gzip.compress(body, compresslevel=6, mtime=0),
+        "etag":          f'"{digest}"',
+        "etag_gzip":     f'"{digest}-gz"',
+        "last_modified": format_datetime(modified_at, usegmt=True),
+        "modified_at":   modified_at,
+    }
+
+
+def publish_snapshot_entry(server: ThreadingHTTPServer, payload: dict,
+                           modified_at: datetime.datetime) -> None:
+    """서버의 응답 캐시 교체. 내용이 직전과 같으면 Last-Modified 유지"""
+    entry = build_snapshot_entry(payload, modified_at)
+    with server.entry_lock:
+        current = server.snapshot_entry
+        if current is None or current["etag"] != entry["etag"]:
+            server.snapshot_entry = entry
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """
+    Accept-Encoding 헤더의 q 값 기준 gzip 허용 여부.
+    gzip(x-gzip)이 명시되면 그 q 값, 없으면 '*'의 q 값을 따르며 q=0은 거부.
+    """
+    if not accept_encoding:
+        return False
+
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            qvalues[coding.lower()] = q
+
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qvalues:
+            return qvalues[coding] > 0
+    return False
+
+
+# ============================================================
+# HTTP 요청 처리
+# ============================================================
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD /snapshot 요청 처리 (조건부 요청 및 gzip 지원)"""
+
+    server_version = "GSWeatherSnapshot/1.0"
+
+    def do_GET(self) -> None:
+        self._respond(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool) -> None:
+        if self.path.split("?", 1)[0] not in SNAPSHOT_PATHS:
+            self.send_error(404)
+            return
+
+        entry = self.server.snapshot_entry
+        if entry is None:
+            self.send_error(503, "분석 스냅샷이 아직 없습니다.")
+            return
+
+        use_gzip = accepts_gzip(self.headers.get("Accept-Encoding"))
+        etag     = entry["etag_gzip"] if use_gzip else entry["etag"]
+
+        if self._is_not_modified(entry, etag):
+            self.send_response(304)
+            self._send_cache_headers(entry, etag)
+            self.end_headers()
+            return
+
+        body = entry["gzip"] if use_gzip else entry["body"]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self._send_cache_headers(entry, etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _is_not_modified(self, entry: dict, etag: str) -> bool:
+        """If-None-Match 우선(약한 비교), 없으면 If-Modified-Since로 변경 여부 판단"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return entry["modified_at"] <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_cache_headers(self, entry: dict, etag: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", entry["last_modified"])
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def log_message(self, format: str, *args) -> None:
+        """폴링 요청마다 로그가 쌓이지 않도록 접근 로그 생략"""
+
+
+def start_snapshot_server(host: str, port: int) -> ThreadingHTTPServer:
+    """스냅샷 API 서버를 데몬 스레드로 시작 후 서버 객체 반환"""
+    server = ThreadingHTTPServer((host, port), SnapshotRequestHandler)
+    server.daemon_threads = True
+    server.snapshot_entry = None
+    server.entry_lock     = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="snapshot-api", daemon=True).start()
+    return server
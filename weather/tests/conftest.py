@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app.py와 같은 방식으로 weather 디렉토리의 모듈(alert_dispatch 등)을 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,132 @@
+"""텔레그램 발송기 및 변동분 알림 기준 갱신 테스트"""
+import os
+import json
+
+import pytest
+import requests
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import alert_dispatch
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+BULLETIN = "o 한파주의보 : 경기도(용인, 오산)"
+
+
+class FakeResponse:
+    def __init__(self, data: dict, status_code: int = 200):
+        self._data       = data
+        self.status_code = status_code
+        self.content     = json.dumps(data).encode()
+        self.headers     = {}
+
+    def json(self) -> dict:
+        return self._data
+
+
+def fake_get(url, timeout=None, **kwargs):
+    """기상청 API 응답 (모든 격자 -16℃, 한파주의보)"""
+    if "getUltraSrtNcst" in url:
+        items = [{"category": "T1H", "obsrValue": "-16"}, {"category": "WSD", "obsrValue": "2"}]
+        return FakeResponse({"response": {"header": {"resultCode": "00"},
+                                          "body": {"items": {"item": items}}}})
+    if "getPwnStatus" in url:
+        item = {"tmFc": 202601150600, "tmSeq": 1, "t6": BULLETIN}
+        return FakeResponse({"response": {"header": {"resultCode": "00"},
+                                          "body": {"items": {"item": [item]}}}})
+    raise requests.ConnectionError(url)
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    """텔레그램 전송을 가로채 기록. statuses 순서대로 응답 코드를 돌려줌"""
+    state = {"statuses": [], "texts": [], "dispatchers": []}
+
+    def fake_post(url, json=None, timeout=None, **kwargs):
+        state["texts"].append(json["text"])
+        status = state["statuses"].pop(0) if state["statuses"] else 200
+        return FakeResponse({"ok": status == 200}, status)
+
+    start = alert_dispatch.start_dispatcher
+
+    def capture_dispatcher(token):
+        dispatcher = start(token)
+        state["dispatchers"].append(dispatcher)
+        return dispatcher
+
+    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(alert_dispatch, "start_dispatcher", capture_dispatcher)
+    monkeypatch.setattr(alert_dispatch, "CHAT_INTERVAL_SEC", 0.0)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield state
+    st.cache_resource.clear()
+
+
+def wait_sent(state: dict) -> list[dict]:
+    """대기열이 빌 때까지 기다린 뒤 전송 결과 로그 반환"""
+    dispatcher = state["dispatchers"][-1]
+    dispatcher["queue"].join()
+    return list(dispatcher["log"])
+
+
+def click_send(at: AppTest) -> AppTest:
+    next(b for b in at.button if "텔레그램" in b.label).click().run()
+    return at
+
+
+def test_split_message_respects_limit():
+    text  = "\n".join(f"현장 {i:04d} 작업중지" for i in range(2000))
+    parts = alert_dispatch.split_message(text)
+    assert len(parts) > 1
+    assert all(alert_dispatch.text_length(p) <= alert_dispatch.TELEGRAM_MAX_LEN for p in parts)
+    assert parts[-1].endswith(f"({len(parts)}/{len(parts)})")
+
+
+def test_failed_send_reports_and_allows_resend(telegram):
+    telegram["statuses"] = [400]
+    dispatcher = alert_dispatch.start_dispatcher("TOKEN")
+    results    = []
+
+    assert alert_dispatch.enqueue_message(dispatcher, "1", "메시지", on_done=results.append)
+    wait_sent(telegram)
+    assert results == [False]
+
+    # 실패한 내용은 중복 차단이 풀려 다시 등록 가능
+    assert alert_dispatch.enqueue_message(dispatcher, "1", "메시지", on_done=results.append)
+    wait_sent(telegram)
+    assert results == [False, True]
+    assert not alert_dispatch.enqueue_message(dispatcher, "1", "메시지")
+
+
+def test_failed_diff_is_resent_on_next_run(telegram):
+    telegram["statuses"] = [400]
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets["api_key"]             = "KEY"
+    at.secrets["telegram_token"]      = "TOKEN"
+    at.secrets["telegram_chat_id"]    = "1"
+    at.secrets["telegram_auto_alert"] = True
+    at.secrets["snapshot_api_port"]   = 0
+
+    # 1) 분석 직후 자동 알림 → 전송 실패
+    at.run()
+    assert not at.exception
+    log = wait_sent(telegram)
+    assert [entry["ok"] for entry in log] == [False]
+    assert len(telegram["texts"]) == 1
+    failed_text = telegram["texts"][0]
+    assert "변동" in failed_text
+
+    # 2) 다음 전송: 기준이 갱신되지 않았으므로 같은 변동분을 다시 전송
+    click_send(at)
+    log = wait_sent(telegram)
+    assert [entry["ok"] for entry in log] == [False, True]
+    assert telegram["texts"][1] == failed_text
+
+    # 3) 전송이 확인된 뒤에는 변동 없음
+    click_send(at)
+    wait_sent(telegram)
+    assert len(telegram["texts"]) == 2
+    assert any("변동 없음" in s.value for s in at.success)
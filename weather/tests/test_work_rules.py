@@ -0,0 +1,172 @@
+"""작업 통제 규칙 엔진 및 설정 검증 테스트"""
+import os
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import work_rules
+from work_rules import (
+    NOWCAST_CATEGORIES, NOWCAST_INDEX, WARNING_TYPES, MARKER_COLORS, MARKER_ICONS,
+    STATUS_NORMAL, STATUS_WARNING, STATUS_STOP_OUT, STATUS_STOP_ALL,
+)
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+T0 = 1_760_000_000   # 기준 관측 시각 (epoch 초)
+
+
+def make_rules(**changes) -> dict:
+    rules = copy.deepcopy(work_rules.WORK_RULES_DEFAULT)
+    rules.update(changes)
+    return rules
+
+
+def make_obs(temps, wind=0.0, rain=0.0) -> np.ndarray:
+    """현장 × NOWCAST_CATEGORIES 관측 행렬 (기온·풍속·강수만 채움)"""
+    obs = np.full((len(temps), len(NOWCAST_CATEGORIES)), np.nan, dtype=np.float32)
+    obs[:, NOWCAST_INDEX["T1H"]] = temps
+    obs[:, NOWCAST_INDEX["WSD"]] = wind
+    obs[:, NOWCAST_INDEX["RN1"]] = rain
+    return obs
+
+
+def warn_mask(*names: str) -> int:
+    return sum(1 << WARNING_TYPES.index(name) for name in names)
+
+
+def evaluate(temps, rules=None, sites=None, masks=None, prev=None, since=T0, obs_ts=T0,
+             wind=0.0, rain=0.0) -> dict[str, np.ndarray]:
+    """작은 배열로 규칙을 컴파일·평가 (prev: 직전 상태 코드, 없으면 -1)"""
+    n        = len(temps)
+    sites    = sites if sites is not None else pd.DataFrame({"사업부": ["건축"] * n})
+    compiled = work_rules.compile_work_rules(rules or make_rules(), sites)
+    return work_rules.evaluate_work_rules(
+        compiled, make_obs(temps, wind, rain),
+        np.full(n, obs_ts, dtype=np.uint32),
+        np.array(masks if masks is not None else [0] * n, dtype=np.uint32),
+        np.array(prev if prev is not None else [-1] * n, dtype=np.int8),
+        np.full(n, since, dtype=np.uint32),
+    )
+
+
+# ============================================================
+# 규칙 엔진 (compile_work_rules / evaluate_work_rules)
+# ============================================================
+
+def test_stop_is_entered_immediately():
+    result = evaluate([-15.0, -12.0, -11.9], obs_ts=T0 + 600)
+    assert result["status"].tolist() == [STATUS_STOP_ALL, STATUS_STOP_OUT, STATUS_NORMAL]
+    # 상태가 바뀐 현장은 이번 관측 시각부터
+    assert result["since"].tolist() == [T0 + 600] * 3
+
+
+def test_release_needs_band_and_min_hold():
+    prev = [STATUS_STOP_ALL]
+    # 기준+band(-14℃) 초과, 60분 경과 → 한 단계 해제
+    assert evaluate([-13.9], prev=prev, obs_ts=T0 + 3600)["status"].tolist() == [STATUS_STOP_OUT]
+    # 30분만 경과 → 유지
+    held = evaluate([-13.9], prev=prev, obs_ts=T0 + 1800)
+    assert held["status"].tolist() == [STATUS_STOP_ALL]
+    assert held["since"].tolist() == [T0]
+    # 60분 경과했지만 band 이내 → 유지
+    assert evaluate([-14.5], prev=prev, obs_ts=T0 + 3600)["status"].tolist() == [STATUS_STOP_ALL]
+    # 옥외 작업중지 해제도 같은 조건 (-11℃ 초과 + 60분)
+    prev = [STATUS_STOP_OUT]
+    assert evaluate([-10.9], prev=prev, obs_ts=T0 + 3600)["status"].tolist() == [STATUS_NORMAL]
+    assert evaluate([-11.5], prev=prev, obs_ts=T0 + 3600)["status"].tolist() == [STATUS_STOP_OUT]
+
+
+def test_overrides_apply_per_division():
+    rules = make_rules(overrides=[{"column": "사업부", "value": "플랜트", "stop_all": -13, "stop_out": -10}])
+    sites = pd.DataFrame({"사업부": ["건축", "플랜트", "플랜트"]})
+    compiled = work_rules.compile_work_rules(rules, sites)
+    assert compiled["th_all"].tolist() == [-15, -13, -13]
+    assert compiled["th_out"].tolist() == [-12, -10, -10]
+
+    result = evaluate([-11.0, -11.0, -13.0], rules=rules, sites=sites)
+    assert result["status"].tolist() == [STATUS_NORMAL, STATUS_STOP_OUT, STATUS_STOP_ALL]
+
+
+def test_warning_rules_take_the_maximum():
+    rules  = make_rules(warnings={"한파": "stop_out", "한파경보": "stop_all"})
+    masks  = [warn_mask("한파주의보"), warn_mask("한파경보"), warn_mask("강풍주의보"),
+              warn_mask("한파예비특보"), warn_mask("한파주의보", "강풍주의보")]
+    temps  = [0.0, 0.0, 0.0, 0.0, -20.0]
+    result = evaluate(temps, rules=rules, masks=masks)
+    # 유형명 > 키워드 > 기본, 예비특보는 키워드 규칙 미적용, 기온 단계와 특보 단계 중 큰 값
+    assert result["status"].tolist() == [
+        STATUS_STOP_OUT, STATUS_STOP_ALL, STATUS_WARNING, STATUS_WARNING, STATUS_STOP_ALL,
+    ]
+
+
+def test_marker_and_alert_derivation():
+    masks  = [0, 0, 0, 0, warn_mask("강풍경보"), warn_mask("한파주의보"), 0]
+    temps  = [-16.0, -13.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    winds  = np.array([0.0, 0.0, 12.0, 0.0, 0.0, 0.0, 0.0])
+    rains  = np.array([0.0, 0.0, 0.0, 2.0, 0.0, 0.0, 0.0])
+    result = evaluate(temps, masks=masks, wind=winds, rain=rains)
+
+    colors = [MARKER_COLORS[c] for c in result["color"]]
+    icons  = [MARKER_ICONS[i] for i in result["icon"]]
+    assert colors == ["purple", "red", "black", "black", "darkred", "orange", "blue"]
+    assert icons == ["ban-circle", "minus-sign", "flag", "tint", "flag", "asterisk", "info-sign"]
+    # 기본 통제: 0 = 풍속 20, 1 = 풍속 10, 2 = 강수 1mm
+    assert result["ctrl_mask"].tolist() == [0, 0, 0b010, 0b100, 0, 0, 0]
+    # 알림 대상은 alert_min_status(기본 stop_out) 이상
+    assert result["alert"].tolist() == [True, True, False, False, False, False, False]
+
+
+# ============================================================
+# 설정 검증 (secrets [work_rules] → st.warning 후 기본 규칙)
+# ============================================================
+
+@pytest.fixture
+def offline(monkeypatch):
+    """기상청 API 호출 차단 (규칙 로드만 확인)"""
+    def fail_get(url, timeout=None, **kwargs):
+        raise requests.ConnectionError(url)
+
+    monkeypatch.setattr(requests, "get", fail_get)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield
+    st.cache_resource.clear()
+
+
+def run_app(work_rules: dict) -> AppTest:
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets["api_key"]           = "KEY"
+    at.secrets["snapshot_api_port"] = 0
+    at.secrets["work_rules"]        = work_rules
+    at.run()
+    assert not at.exception
+    return at
+
+
+def rule_warnings(at: AppTest) -> list[str]:
+    return [w.value for w in at.warning if "work_rules" in w.value]
+
+
+@pytest.mark.parametrize("work_rules, message", [
+    ({"warnings": {"한파경보": "stop"}}, "알 수 없는 상태 'stop'"),
+    ({"alert_min_status": "danger"}, "alert_min_status"),
+    ({"temp": {"stop_all": "-15"}}, "숫자여야"),
+    ({"overrides": [{"column": "사업부", "value": "건축", "stop_all": -10, "stop_out": -12}]},
+     "overrides[0]"),
+    ({"hysteresis": {"band": 0}}, "hysteresis.band"),
+    ({"controls": [{"name": "시정", "category": "VIS", "threshold": 1}]}, "'VIS'"),
+])
+def test_invalid_rules_fall_back_to_default(offline, work_rules, message):
+    at = run_app(work_rules)
+    warnings = rule_warnings(at)
+    assert len(warnings) == 1 and message in warnings[0]
+
+
+def test_valid_rules_pass_without_warning(offline):
+    at = run_app({"warnings": {"한파경보": "stop_out"}, "hysteresis": {"band": 2.0}})
+    assert not rule_warnings(at)
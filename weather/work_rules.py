@@ -0,0 +1,282 @@
+"""
+GS건설 현장 작업 통제 규칙 엔진
+================================
+기온 기준·특보·강풍/강수 통제 규칙을 전체 현장 배열에 한 번에 적용하는 모듈.
+Streamlit 의존성 없이 numpy/pandas만 사용하며 app.py가 설정 로드와 화면 표시를 맡는다.
+
+- 규칙 설정(WORK_RULES_DEFAULT 형식) 검증 → 배열 연산용 컴파일 → 평가
+- 상태·특보·관측 요소·지도 마커 코드 체계도 이 모듈에서 정의
+"""
+
+# ============================================================
+# 라이브러리 임포트
+# ============================================================
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# 상수 및 설정값
+# ============================================================
+# 혹한기 작업 중지 기준 온도 (℃)
+TEMP_STOP_ALL   = -15   # 전면(옥내+옥외) 작업 중지
+TEMP_STOP_OUT   = -12   # 옥외 작업 중지
+
+# 초단기실황 관측 요소 (격자별 관측 벡터 순서)
+# T1H 기온(℃) / RN1 1시간 강수량(mm) / UUU·VVV 동서·남북 바람성분(m/s)
+# REH 습도(%) / PTY 강수형태(코드) / VEC 풍향(deg) / WSD 풍속(m/s)
+NOWCAST_CATEGORIES = ["T1H", "RN1", "UUU", "VVV", "REH", "PTY", "VEC", "WSD"]
+NOWCAST_INDEX      = {cat: i for i, cat in enumerate(NOWCAST_CATEGORIES)}
+
+ALLOWED_WARNING_KEYWORDS = ["한파", "폭염", "호우", "대설", "태풍", "강풍"]
+ICON_MAP = {
+    "한파": "asterisk",
+    "건조": "fire",
+    "폭염": "sun",
+    "호우": "tint",
+    "대설": "snowflake-o",
+    "태풍": "bullseye",
+    "강풍": "flag",
+}
+
+# 특보 유형 비트마스크 순서 (허용 특보 × 주의보/경보/예비특보)
+WARNING_LEVELS = ["주의보", "경보", "예비특보"]
+WARNING_TYPES  = [f"{kw}{level}" for kw in ALLOWED_WARNING_KEYWORDS for level in WARNING_LEVELS]
+
+# 현장 상태 코드 (분석 결과는 코드로 보관하고 화면 표시 시점에만 문자열로 변환)
+STATUS_LABELS = ["정상", "⚠️ 기상특보", "🛑 옥외작업중지", "⛔ 전면작업중지"]
+STATUS_NORMAL, STATUS_WARNING, STATUS_STOP_OUT, STATUS_STOP_ALL = range(len(STATUS_LABELS))
+STATUS_KEYS   = {"normal": STATUS_NORMAL, "warning": STATUS_WARNING,
+                 "stop_out": STATUS_STOP_OUT, "stop_all": STATUS_STOP_ALL}   # 규칙 설정용 이름
+
+# 지도 마커 색상/아이콘 (스냅샷에는 범주형 코드로 보관)
+MARKER_COLORS = ["blue", "orange", "darkred", "black", "red", "purple"]
+MARKER_ICONS  = ["info-sign", "exclamation", *dict.fromkeys(ICON_MAP.values()),
+                 "minus-sign", "ban-circle"]
+
+# 작업 통제 규칙 (기본값). secrets의 [work_rules] 항목으로 덮어쓸 수 있음
+# - temp       : 혹한기 작업중지 기준 온도 (℃ 이하)
+# - overrides  : 사업부/지역별 기준 온도 (뒤 항목 우선)
+#                예) {"column": "사업부", "value": "플랜트", "stop_out": -10, "stop_all": -13}
+# - warnings   : 특보 유형('태풍경보') 또는 키워드('태풍')별 상태, 미지정 특보는 'warning'
+#                ('한파예비특보' 등 예비특보는 키워드 규칙 대신 유형명으로만 지정)
+# - hysteresis : 작업중지 해제 조건. 기온이 기준보다 band℃ 넘게 오르고 해당 상태가
+#                관측 시각 기준 min_hold_min분 이상 유지된 뒤에만 해제
+# - controls   : 강풍/강수 작업 통제 (산업안전보건기준에 관한 규칙 제37조·제383조).
+#                관측 요소 값이 기준값 이상이면 발동. 실황 풍속은 10분 평균풍속이므로
+#                순간풍속 기준보다 늦게 발동될 수 있음. 사용하지 않으려면 controls = []
+# - alert_min_status : 텔레그램 알림에 포함할 최소 상태
+WORK_RULES_DEFAULT = {
+    "temp":       {"stop_all": TEMP_STOP_ALL, "stop_out": TEMP_STOP_OUT},
+    "overrides":  [],
+    "warnings":   {},
+    "hysteresis": {"band": 1.0, "min_hold_min": 60},
+    "controls": [
+        {"name": "강풍 크레인 운전중지", "category": "WSD", "threshold": 20.0,
+         "message": "풍속 20m/s 이상입니다. 타워크레인 운전 작업을 중지하십시오."},
+        {"name": "강풍 양중/철골작업 중지", "category": "WSD", "threshold": 10.0,
+         "message": "풍속 10m/s 이상입니다. 크레인 설치·해체 및 철골 작업을 중지하십시오."},
+        {"name": "강수 철골작업 중지", "category": "RN1", "threshold": 1.0,
+         "message": "시간당 강수량 1mm 이상입니다. 철골 작업을 중지하십시오."},
+    ],
+    "alert_min_status": "stop_out",
+}
+
+
+# ============================================================
+# 규칙 검증 / 컴파일 / 평가
+# ============================================================
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_work_rules(rules: dict) -> list[str]:
+    """
+    규칙 설정 검증. 오류 메시지 목록 반환 (빈 목록이면 정상).
+    상태 이름은 STATUS_KEYS, 통제 항목은 NOWCAST_INDEX 기준이며
+    작업중지 해제 기준(stop_out)은 전면중지 기준(stop_all)보다 높아야 한다.
+    """
+    errors = [f"알 수 없는 항목 '{key}'" for key in rules if key not in WORK_RULES_DEFAULT]
+
+    def _check_temp(where: str, stop_all, stop_out) -> None:
+        if not (_is_number(stop_all) and _is_number(stop_out)):
+            errors.append(f"{where}: 기준 온도는 숫자여야 합니다 ({stop_all!r}, {stop_out!r})")
+        elif stop_out <= stop_all:
+            errors.append(f"{where}: 옥외 작업중지 기준({stop_out})이 전면 작업중지 기준({stop_all})보다 높아야 합니다")
+
+    temp = rules["temp"]
+    if not isinstance(temp, dict):
+        errors.append("temp: 표 형식이어야 합니다")
+        temp = WORK_RULES_DEFAULT["temp"]
+    _check_temp("temp", temp.get("stop_all"), temp.get("stop_out"))
+
+    overrides = rules["overrides"]
+    if not isinstance(overrides, list) or not all(isinstance(o, dict) for o in overrides):
+        errors.append("overrides: 표 목록이어야 합니다")
+        overrides = []
+    for i, override in enumerate(overrides):
+        if not isinstance(override.get("column"), str) or "value" not in override:
+            errors.append(f"overrides[{i}]: column/value가 필요합니다")
+        _check_temp(f"overrides[{i}]",
+                    override.get("stop_all", temp.get("stop_all")), override.get("stop_out", temp.get("stop_out")))
+
+    warn_rules = rules["warnings"]
+    if not isinstance(warn_rules, dict):
+        errors.append("warnings: 표 형식이어야 합니다")
+        warn_rules = {}
+    for w_name, status in warn_rules.items():
+        if w_name not in WARNING_TYPES and w_name not in ALLOWED_WARNING_KEYWORDS:
+            errors.append(f"warnings: 알 수 없는 특보 '{w_name}'")
+        if status not in STATUS_KEYS:
+            errors.append(f"warnings.{w_name}: 알 수 없는 상태 '{status}'")
+
+    hysteresis = rules["hysteresis"]
+    if not isinstance(hysteresis, dict):
+        errors.append("hysteresis: 표 형식이어야 합니다")
+    else:
+        band, hold = hysteresis.get("band"), hysteresis.get("min_hold_min")
+        if not _is_number(band) or band <= 0:
+            errors.append(f"hysteresis.band: 0보다 큰 숫자여야 합니다 ({band!r})")
+        if not _is_number(hold) or hold < 0:
+            errors.append(f"hysteresis.min_hold_min: 0 이상의 숫자여야 합니다 ({hold!r})")
+
+    controls = rules["controls"]
+    if not isinstance(controls, list) or not all(isinstance(c, dict) for c in controls):
+        errors.append("controls: 표 목록이어야 합니다")
+        controls = []
+    if len(controls) > 8:
+        errors.append(f"controls: 최대 8개까지 지정할 수 있습니다 ({len(controls)}개)")
+    for i, control in enumerate(controls):
+        if control.get("category") not in NOWCAST_INDEX:
+            errors.append(f"controls[{i}]: 알 수 없는 관측 요소 '{control.get('category')}'")
+        if not _is_number(control.get("threshold")):
+            errors.append(f"controls[{i}]: 기준값은 숫자여야 합니다 ({control.get('threshold')!r})")
+        if not control.get("name"):
+            errors.append(f"controls[{i}]: name이 필요합니다")
+
+    if rules["alert_min_status"] not in STATUS_KEYS:
+        errors.append(f"alert_min_status: 알 수 없는 상태 '{rules['alert_min_status']}'")
+    return errors
+
+
+def compile_work_rules(rules: dict, sites: pd.DataFrame) -> dict:
+    """
+    규칙 설정 → 배열 연산용 형태로 변환.
+    현장별 기준 온도 배열(th_all/th_out), 특보 비트별 상태, 경보·아이콘 비트마스크,
+    통제 항목(관측 요소 위치, 기준값) 목록 등.
+    """
+    n_sites = len(sites)
+    th_all  = np.full(n_sites, rules["temp"]["stop_all"], dtype=np.float32)
+    th_out  = np.full(n_sites, rules["temp"]["stop_out"], dtype=np.float32)
+    for override in rules["overrides"]:
+        col = override.get("column")
+        if col not in sites.columns:
+            continue
+        match = (sites[col].astype(str) == str(override.get("value"))).to_numpy()
+        if "stop_all" in override:
+            th_all[match] = override["stop_all"]
+        if "stop_out" in override:
+            th_out[match] = override["stop_out"]
+
+    # 특보 유형별 상태 (유형명 > 키워드 > 기본 '기상특보').
+    # 예비특보는 발효 전이므로 키워드 규칙을 적용하지 않고 유형명으로 지정한 경우만 반영
+    warn_rules  = rules["warnings"]
+    warn_levels = []
+    for bit, w_name in enumerate(WARNING_TYPES):
+        kw, level = divmod(bit, len(WARNING_LEVELS))
+        fallback  = "warning" if WARNING_LEVELS[level] == "예비특보" else \
+            warn_rules.get(ALLOWED_WARNING_KEYWORDS[kw], "warning")
+        warn_levels.append(STATUS_KEYS[warn_rules.get(w_name, fallback)])
+    warn_levels = np.array(warn_levels, dtype=np.int8)
+
+    def _keyword_mask(predicate) -> int:
+        return sum(1 << bit for bit, w_name in enumerate(WARNING_TYPES) if predicate(w_name))
+
+    controls = [
+        (NOWCAST_INDEX[c["category"]], float(c["threshold"]), c["category"] == "RN1")
+        for c in rules["controls"]
+    ]
+    hysteresis = rules["hysteresis"]
+    return {
+        "th_all":       th_all,
+        "th_out":       th_out,
+        "warn_levels":  warn_levels,
+        "severe_mask":  _keyword_mask(lambda w: w.endswith("경보")),
+        "icon_masks":   [
+            (MARKER_ICONS.index(icon), _keyword_mask(lambda w, kw=kw: w.startswith(kw)))
+            for kw, icon in ICON_MAP.items() if kw in ALLOWED_WARNING_KEYWORDS
+        ],
+        "controls":     controls,
+        "rain_mask":    sum(1 << bit for bit, (_, _, is_rain) in enumerate(controls) if is_rain),
+        "band":         float(hysteresis["band"]),
+        "min_hold_sec": int(hysteresis["min_hold_min"] * 60),
+        "alert_min":    STATUS_KEYS[rules["alert_min_status"]],
+    }
+
+
+def evaluate_work_rules(compiled: dict, obs: np.ndarray, obs_ts: np.ndarray, warn_masks: np.ndarray,
+                        prev_codes: np.ndarray, prev_since: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    전체 현장에 규칙을 한 번에 적용해 상태·통제·지도 표시·알림 여부를 함께 산출.
+    {'status', 'since', 'ctrl_mask', 'color', 'icon', 'alert'} 배열 반환.
+    prev_codes/prev_since는 직전 스냅샷의 상태 코드(-1 = 없음)와 상태 시작 시각.
+    """
+    temps  = obs[:, NOWCAST_INDEX["T1H"]]
+    th_all = compiled["th_all"]
+    th_out = compiled["th_out"]
+    band   = compiled["band"]
+
+    # 1) 기온 단계. 작업중지 진입은 즉시, 해제는 기준+band 초과 및 최소 유지시간 경과 후
+    held     = obs_ts.astype(np.int64) - prev_since.astype(np.int64) < compiled["min_hold_sec"]
+    keep_all = (prev_codes == STATUS_STOP_ALL) & ((temps <= th_all + band) | held)
+    keep_out = (prev_codes >= STATUS_STOP_OUT) & ((temps <= th_out + band) | held)
+    temp_level = np.select(
+        [(temps <= th_all) | keep_all, (temps <= th_out) | keep_out],
+        [STATUS_STOP_ALL, STATUS_STOP_OUT], default=STATUS_NORMAL,
+    )
+
+    # 2) 특보 단계 (발효 특보별 상태 중 최댓값)
+    bits       = (warn_masks[:, None].astype(np.int64) >> np.arange(len(WARNING_TYPES))) & 1
+    warn_level = (bits * compiled["warn_levels"]).max(axis=1)
+    status     = np.maximum(temp_level, warn_level).astype(np.int8)
+
+    # 3) 강풍/강수 작업 통제
+    ctrl_mask = np.zeros(len(obs), dtype=np.uint8)
+    for bit, (col, threshold, _) in enumerate(compiled["controls"]):
+        ctrl_mask[obs[:, col] >= threshold] |= np.uint8(1 << bit)
+
+    # 4) 상태 시작 시각 (상태가 바뀐 현장만 이번 관측 시각으로 갱신)
+    since = np.where(status == prev_codes, prev_since, obs_ts).astype(np.uint32)
+
+    # 5) 지도 색상/아이콘 (작업중지 > 강풍/강수 통제 > 특보 > 정상)
+    is_stop_all = status == STATUS_STOP_ALL
+    is_stop_out = status == STATUS_STOP_OUT
+    has_ctrl    = ctrl_mask != 0
+    is_warning  = status == STATUS_WARNING
+    is_severe   = (warn_masks & compiled["severe_mask"]) != 0
+    warn_icon   = np.select(
+        [(warn_masks & mask) != 0 for _, mask in compiled["icon_masks"]],
+        [icon for icon, _ in compiled["icon_masks"]],
+        default=MARKER_ICONS.index("exclamation"),
+    )
+    color = np.select(
+        [is_stop_all, is_stop_out, has_ctrl, is_warning & is_severe, is_warning],
+        [MARKER_COLORS.index(c) for c in ("purple", "red", "black", "darkred", "orange")],
+        default=MARKER_COLORS.index("blue"),
+    )
+    icon = np.select(
+        [is_stop_all, is_stop_out, has_ctrl & ((ctrl_mask & ~np.uint8(compiled["rain_mask"])) == 0), has_ctrl, is_warning],
+        [MARKER_ICONS.index("ban-circle"), MARKER_ICONS.index("minus-sign"),
+         MARKER_ICONS.index("tint"), MARKER_ICONS.index("flag"), warn_icon],
+        default=MARKER_ICONS.index("info-sign"),
+    )
+
+    return {
+        "status":    status,
+        "since":     since,
+        "ctrl_mask": ctrl_mask,
+        "color":     color.astype(np.int8),
+        "icon":      icon.astype(np.int8),
+        "alert":     status >= compiled["alert_min"],
+    }